@@ -0,0 +1,96 @@
+"""baseline schema: sites, sources, articles
+
+Revision ID: 0a7b3c9d1e25
+Revises: 
+Create Date: 2026-10-17 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0a7b3c9d1e25'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by Base.metadata.create_all already have these tables
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    
+    if "sites" not in tables:
+        op.create_table(
+            "sites",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("name", sa.String(length=255), nullable=False),
+            sa.Column("url", sa.String(length=500), nullable=False),
+            sa.Column("wp_username", sa.String(length=255), nullable=False),
+            sa.Column("wp_app_password", sa.Text(), nullable=False),
+            sa.Column("category_map", sa.JSON(), nullable=True),
+            sa.Column("bing_cookie", sa.Text(), nullable=True),
+            sa.Column("velocity_mode", sa.Enum("NEWS", "EVERGREEN", name="velocitymode"), nullable=True),
+            sa.Column("target_language", sa.String(length=10), nullable=True),
+            sa.Column("default_author_id", sa.String(length=50), nullable=True),
+            sa.Column("watermark_text", sa.String(length=255), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+    
+    if "sources" not in tables:
+        op.create_table(
+            "sources",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("site_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("sites.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("name", sa.String(length=255), nullable=False),
+            sa.Column("type", sa.Enum("RSS", "URL", name="sourcetype"), nullable=True),
+            sa.Column("url", sa.String(length=1000), nullable=False),
+            sa.Column("scrape_config", sa.JSON(), nullable=True),
+            sa.Column("poll_interval", sa.Integer(), nullable=True),
+            sa.Column("max_articles_per_poll", sa.Integer(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("last_polled_at", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+    
+    if "articles" not in tables:
+        op.create_table(
+            "articles",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("source_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("sources.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("site_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("sites.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("original_url", sa.String(length=1000), nullable=False),
+            sa.Column("original_title", sa.Text(), nullable=False),
+            sa.Column("original_content", sa.Text(), nullable=False),
+            sa.Column("original_image_url", sa.String(length=1000), nullable=True),
+            sa.Column("processed_title", sa.Text(), nullable=True),
+            sa.Column("processed_content", sa.Text(), nullable=True),
+            sa.Column("meta_description", sa.Text(), nullable=True),
+            sa.Column("source_language", sa.String(length=10), nullable=True),
+            sa.Column("target_language", sa.String(length=10), nullable=True),
+            sa.Column("category_id", sa.Integer(), nullable=True),
+            sa.Column("category_name", sa.String(length=255), nullable=True),
+            sa.Column("vector_id", sa.String(length=255), nullable=True),
+            sa.Column("similarity_score", sa.String(length=50), nullable=True),
+            sa.Column("image_url", sa.String(length=1000), nullable=True),
+            sa.Column("image_source", sa.Enum("ORIGINAL", "STOCK", "BING", "FLUX", "NONE", name="imagesource"), nullable=True),
+            sa.Column("wp_post_id", sa.Integer(), nullable=True),
+            sa.Column("wp_post_url", sa.String(length=1000), nullable=True),
+            sa.Column("status", sa.Enum("PENDING", "PROCESSING", "PUBLISHED", "FAILED", "DUPLICATE", name="articlestatus"), nullable=True),
+            sa.Column("error_message", sa.Text(), nullable=True),
+            sa.Column("retry_count", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("processed_at", sa.DateTime(), nullable=True),
+            sa.Column("published_at", sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade():
+    op.drop_table("articles")
+    op.drop_table("sources")
+    op.drop_table("sites")
+    for name in ("articlestatus", "imagesource", "sourcetype", "velocitymode"):
+        sa.Enum(name=name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,75 @@
+"""add unique url_hash to articles
+
+Revision ID: 3f1c2a9b7d10
+Revises: 0a7b3c9d1e25
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.urls import url_hash
+
+
+revision = '3f1c2a9b7d10'
+down_revision = '0a7b3c9d1e25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    
+    # Tables may already exist from Base.metadata.create_all
+    columns = {c["name"] for c in inspector.get_columns("articles")}
+    if "url_hash" not in columns:
+        op.add_column("articles", sa.Column("url_hash", sa.String(length=64), nullable=True))
+    
+    # Backfill in batches; the oldest row keeps the hash, later copies stay NULL.
+    # Rows are streamed through a server-side cursor, so only the digests seen
+    # so far (needed to spot duplicates before the unique index exists) are kept.
+    articles = sa.table(
+        "articles",
+        sa.column("id"),
+        sa.column("original_url", sa.String),
+        sa.column("url_hash", sa.String),
+        sa.column("created_at", sa.DateTime),
+    )
+    seen = {
+        row[0] for row in bind.execute(
+            sa.select(articles.c.url_hash).where(articles.c.url_hash.isnot(None))
+        )
+    }
+    
+    update_stmt = (
+        articles.update()
+        .where(articles.c.id == sa.bindparam("b_id"))
+        .values(url_hash=sa.bindparam("b_hash"))
+    )
+    rows = bind.execute(
+        sa.select(articles.c.id, articles.c.original_url)
+        .where(articles.c.url_hash.is_(None))
+        .order_by(articles.c.created_at.asc(), articles.c.id.asc())
+        .execution_options(yield_per=1000)
+    )
+    
+    for batch in rows.partitions():
+        updates = []
+        for article_id, original_url in batch:
+            digest = url_hash(original_url)
+            if digest in seen:
+                continue
+            seen.add(digest)
+            updates.append({"b_id": article_id, "b_hash": digest})
+        if updates:
+            bind.execute(update_stmt, updates)
+    
+    indexes = {ix["name"] for ix in inspector.get_indexes("articles")}
+    if "ix_articles_url_hash" not in indexes:
+        op.create_index("ix_articles_url_hash", "articles", ["url_hash"], unique=True)
+
+
+def downgrade():
+    op.drop_index("ix_articles_url_hash", table_name="articles")
+    op.drop_column("articles", "url_hash")
@@ -0,0 +1,25 @@
+"""add dedup_embedding to articles
+
+Revision ID: 8b4e6d2c1a57
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '8b4e6d2c1a57'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("articles")}
+    if "dedup_embedding" not in columns:
+        op.add_column("articles", sa.Column("dedup_embedding", sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("articles", "dedup_embedding")
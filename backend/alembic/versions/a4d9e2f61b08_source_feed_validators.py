@@ -0,0 +1,31 @@
+"""add conditional GET validators to sources
+
+Revision ID: a4d9e2f61b08
+Revises: c72d5e1f9a34
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a4d9e2f61b08'
+down_revision = 'c72d5e1f9a34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("sources")}
+    if "etag" not in columns:
+        op.add_column("sources", sa.Column("etag", sa.String(length=500), nullable=True))
+    if "last_modified" not in columns:
+        op.add_column("sources", sa.Column("last_modified", sa.String(length=100), nullable=True))
+    if "content_hash" not in columns:
+        op.add_column("sources", sa.Column("content_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_column("sources", "content_hash")
+    op.drop_column("sources", "last_modified")
+    op.drop_column("sources", "etag")
@@ -0,0 +1,29 @@
+"""add scrape_mode to sources
+
+Revision ID: b5e1f7c3d290
+Revises: a4d9e2f61b08
+Create Date: 2026-10-17 14:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b5e1f7c3d290'
+down_revision = 'a4d9e2f61b08'
+branch_labels = None
+depends_on = None
+
+scrape_mode = sa.Enum('STATIC', 'BROWSER', name='scrapemode')
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("sources")}
+    if "scrape_mode" not in columns:
+        scrape_mode.create(op.get_bind(), checkfirst=True)
+        op.add_column("sources", sa.Column("scrape_mode", scrape_mode, nullable=True))
+
+
+def downgrade():
+    op.drop_column("sources", "scrape_mode")
+    scrape_mode.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,30 @@
+"""add rewrite_mode to sites
+
+Revision ID: c72d5e1f9a34
+Revises: 8b4e6d2c1a57
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c72d5e1f9a34'
+down_revision = '8b4e6d2c1a57'
+branch_labels = None
+depends_on = None
+
+rewrite_mode = sa.Enum('SINGLE_PASS', 'TWO_STEP', name='rewritemode')
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("sites")}
+    if "rewrite_mode" not in columns:
+        rewrite_mode.create(op.get_bind(), checkfirst=True)
+        # Existing sites keep the two-step rewrite; single pass is opt-in per site
+        op.add_column("sites", sa.Column("rewrite_mode", rewrite_mode, nullable=True, server_default="TWO_STEP"))
+
+
+def downgrade():
+    op.drop_column("sites", "rewrite_mode")
+    rewrite_mode.drop(op.get_bind(), checkfirst=True)
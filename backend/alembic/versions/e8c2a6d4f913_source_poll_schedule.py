@@ -0,0 +1,29 @@
+"""add adaptive poll schedule to sources
+
+Revision ID: e8c2a6d4f913
+Revises: b5e1f7c3d290
+Create Date: 2026-10-17 14:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e8c2a6d4f913'
+down_revision = 'b5e1f7c3d290'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("sources")}
+    if "current_poll_interval" not in columns:
+        op.add_column("sources", sa.Column("current_poll_interval", sa.Integer(), nullable=True))
+    if "next_poll_at" not in columns:
+        # NULL means due now: poll_due_sources picks every existing source up on its next tick
+        op.add_column("sources", sa.Column("next_poll_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("sources", "next_poll_at")
+    op.drop_column("sources", "current_poll_interval")
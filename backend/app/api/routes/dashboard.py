@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from datetime import datetime, timedelta
 
 from app.api.deps import get_database
 from app.models import Site, Source, Article, ArticleStatus
+from app.services.embedding_cache import embedding_cache
+from app.services.llm_cache import llm_cache
+from app.services.model_router import model_router
 
 router = APIRouter()
 
@@ -139,3 +142,30 @@ async def get_daily_chart(
         })
     
     return {"data": data}
+
+
+@router.get("/embedding-cache")
+async def get_embedding_cache_stats():
+    """Embedding cache hit/miss counters across all workers"""
+    try:
+        return await embedding_cache.cluster_stats()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Embedding cache unavailable: {e}")
+
+
+@router.get("/llm-cache")
+async def get_llm_cache_stats():
+    """LLM response cache hit rate and size across all workers"""
+    try:
+        return await llm_cache.cluster_stats()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"LLM cache unavailable: {e}")
+
+
+@router.get("/model-router")
+async def get_model_router_stats():
+    """Circuit state, success rate and p95 latency per LLM model"""
+    try:
+        return await model_router.cluster_stats()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Model router state unavailable: {e}")
@@ -38,6 +38,7 @@ async def list_sites(db: AsyncSession = Depends(get_database)):
             "wp_username": site.wp_username,
             "target_language": site.target_language,
             "velocity_mode": site.velocity_mode,
+            "rewrite_mode": site.rewrite_mode,
             "category_map": site.category_map or {},
             "default_author_id": site.default_author_id,
             "watermark_text": site.watermark_text,
@@ -67,6 +68,7 @@ async def create_site(site: SiteCreate, db: AsyncSession = Depends(get_database)
         category_map=site.category_map,
         bing_cookie=encrypted_bing,
         velocity_mode=site.velocity_mode,
+        rewrite_mode=site.rewrite_mode,
         target_language=site.target_language,
         default_author_id=site.default_author_id,
         watermark_text=site.watermark_text,
@@ -84,6 +86,7 @@ async def create_site(site: SiteCreate, db: AsyncSession = Depends(get_database)
         wp_username=new_site.wp_username,
         target_language=new_site.target_language,
         velocity_mode=new_site.velocity_mode,
+        rewrite_mode=new_site.rewrite_mode,
         category_map=new_site.category_map or {},
         default_author_id=new_site.default_author_id,
         watermark_text=new_site.watermark_text,
@@ -121,6 +124,7 @@ async def get_site(site_id: UUID, db: AsyncSession = Depends(get_database)):
         wp_username=site.wp_username,
         target_language=site.target_language,
         velocity_mode=site.velocity_mode,
+        rewrite_mode=site.rewrite_mode,
         category_map=site.category_map or {},
         default_author_id=site.default_author_id,
         watermark_text=site.watermark_text,
@@ -142,6 +142,11 @@ async def update_source(source_id: UUID, source_update: SourceUpdate, db: AsyncS
     for key, value in update_data.items():
         setattr(source, key, value)
     
+    # Restart adaptive polling from the new configured interval
+    if 'poll_interval' in update_data:
+        source.current_poll_interval = None
+        source.next_poll_at = None
+    
     await db.commit()
     await db.refresh(source)
     
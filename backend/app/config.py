@@ -29,9 +29,111 @@ class Settings(BaseSettings):
     secret_key: str = "change-me-in-production"
     allowed_origins: str = "http://localhost:3000"
     
+    # Outbound HTTP connection pooling
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http2_enabled: bool = False
+    
+    # Playwright browser pool
+    browser_max_pages: int = 4
+    browser_recycle_after_pages: int = 200
+    browser_block_resources: bool = True
+    browser_blocked_resource_types: str = "image,media,font"
+    
+    # Concurrent scraping (per poll)
+    scrape_max_concurrency: int = 4
+    scrape_per_domain_concurrency: int = 2
+    scrape_domain_delay: float = 1.0  # seconds between request starts on one domain
+    
+    # Static-HTML fast path: shorter extractions fall back to Playwright
+    static_scrape_min_content_length: int = 300
+    
+    # Streaming RSS fetch: hard cap on bytes read per feed
+    rss_max_bytes: int = 5 * 1024 * 1024
+    
+    # Seen-URL index retention (days)
+    seen_url_ttl_days: int = 30
+    
+    # Adaptive per-source polling
+    poll_min_interval_minutes: int = 5
+    poll_max_interval_minutes: int = 2 * 24 * 60
+    poll_min_interval_factor: float = 0.25
+    poll_max_backoff_factor: float = 8.0
+    poll_backoff_factor: float = 1.5   # applied after a poll with no new articles
+    poll_tighten_factor: float = 0.5   # applied after a poll with new articles
+    
     # Similarity threshold for deduplication
     similarity_threshold: float = 0.80
     
+    # Dedup scope: recency window in days (0 = all history), optionally per site; vector retention
+    dedup_window_days: int = 14
+    dedup_site_scoped: bool = False
+    vector_retention_days: int = 90
+    vector_eviction_batch_size: int = 500
+    
+    # Vector index: "chroma" (HTTP server) or "local" (embedded, persisted under local_index_dir)
+    vector_backend: str = "chroma"
+    local_index_dir: str = "/app/data/vector_index"
+    
+    # Vector write buffer: queue adds/deletes in Redis and flush them in bulk by size or interval (seconds)
+    vector_buffer_enabled: bool = True
+    vector_flush_size: int = 64
+    vector_flush_interval: float = 30.0
+    
+    # LLM response cache (Redis): TTL in seconds and max number of cached completions
+    llm_cache_enabled: bool = True
+    llm_cache_ttl: int = 7 * 24 * 3600
+    llm_cache_max_entries: int = 20000
+    
+    # Long articles: above long_article_tokens (estimated input) rewrite in parallel chunks
+    long_article_tokens: int = 3000
+    rewrite_chunk_tokens: int = 1200
+    rewrite_chunk_max_tokens: int = 2500
+    rewrite_chunk_concurrency: int = 4
+    
+    # Model router: health window per model, circuit breaker and hedging (seconds)
+    router_window: int = 50
+    router_min_calls: int = 10
+    router_failure_threshold: float = 0.5
+    router_open_seconds: int = 60
+    router_probe_timeout: int = 120
+    router_hedge_enabled: bool = True
+    router_hedge_tokens_per_second: float = 50.0  # expected output speed, seeds the hedge delay from max_tokens
+    router_hedge_min_delay: float = 5.0
+    
+    # Cluster-wide API rate limits: comma-separated name=rate/burst (requests per second / bucket size).
+    # Names are providers (openrouter, pexels, unsplash) or OpenRouter model ids; empty disables.
+    rate_limits: str = "openrouter=5/10,pexels=0.05/5,unsplash=0.0125/5"
+    rate_limit_max_wait: float = 120.0  # seconds a call may wait for a token before failing
+    rate_limit_default_backoff: float = 5.0  # seconds to block a bucket on a 429 without Retry-After
+    
+    # Batched dedup: encoder batch size and how many streamed scrape results to group
+    embedding_batch_size: int = 32
+    dedup_batch_size: int = 8
+    
+    # Embedding cache: in-process LRU size, Redis TTL and the model vectors are keyed by
+    embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_cache_size: int = 10000
+    embedding_cache_ttl: int = 7 * 24 * 3600
+    
+    # Embedding backend: "torch" (sentence-transformers), "onnx" (int8 export, see embedding_backend.py) or "remote"
+    embedding_backend: str = "torch"
+    onnx_model_dir: str = "/app/models/onnx"
+    onnx_num_threads: int = 0  # 0 = onnxruntime default
+    
+    # Shared embedding server (embedding_backend = "remote"): URL, backend it runs, micro-batch bounds
+    embedding_server_url: str = "http://embedding_server:8100"
+    embedding_server_backend: str = "torch"
+    embedding_server_max_batch: int = 64
+    embedding_server_max_wait_ms: int = 10
+    embedding_server_timeout: float = 30.0
+    
+    # Fingerprint prefilter: max SimHash bit distance for a near copy, minimum words to compare, retention
+    simhash_max_distance: int = 3
+    simhash_min_tokens: int = 50
+    dedup_index_ttl_days: int = 30
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Tuple
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.config import settings
+from app.services.embedding_backends import EmbeddingBackend, get_embedding_backend
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+
+
+class MicroBatcher:
+    """
+    Collects concurrent /embed requests into one encode call.
+    A batch is closed once it holds max_batch texts or max_wait seconds have
+    passed since its first request; encoding runs on a single thread so the
+    model is never used concurrently.
+    """
+    
+    def __init__(self, backend: EmbeddingBackend, max_batch: int, max_wait: float):
+        self.backend = backend
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue: "asyncio.Queue[Tuple[List[str], asyncio.Future]]" = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.stats = {"requests": 0, "batches": 0, "texts": 0}
+    
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+    
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            count = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            
+            while count < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                count += len(item[0])
+            
+            texts = [text for batch, _ in pending for text in batch]
+            try:
+                vectors = await loop.run_in_executor(
+                    self.executor, self.backend.encode, texts, settings.embedding_batch_size
+                )
+            except Exception as e:
+                logger.error(f"Embedding batch error: {e}")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            offset = 0
+            for batch, future in pending:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(batch)])
+                offset += len(batch)
+            
+            self.stats["requests"] += len(pending)
+            self.stats["batches"] += 1
+            self.stats["texts"] += len(texts)
+
+
+batcher: MicroBatcher = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global batcher
+    # Load the model once for every worker that talks to this process
+    backend = get_embedding_backend(settings.embedding_server_backend)
+    batcher = MicroBatcher(
+        backend,
+        max_batch=settings.embedding_server_max_batch,
+        max_wait=settings.embedding_server_max_wait_ms / 1000
+    )
+    runner = asyncio.create_task(batcher.run())
+    logger.info(f"Embedding server ready ({backend.name}, {backend.model_name})")
+    yield
+    runner.cancel()
+    batcher.executor.shutdown(wait=False)
+
+
+app = FastAPI(title="Empire Embedding Server", lifespan=lifespan)
+
+
+@app.post("/embed")
+async def embed(request: EmbedRequest):
+    """Float32 little-endian vectors, one row per text; the dimension is in X-Embedding-Dim"""
+    if not request.texts:
+        return Response(content=b"", media_type="application/octet-stream", headers={"X-Embedding-Dim": "0"})
+    
+    vectors = np.asarray(await batcher.embed(request.texts), dtype='<f4')
+    return Response(
+        content=vectors.tobytes(),
+        media_type="application/octet-stream",
+        headers={"X-Embedding-Dim": str(vectors.shape[1])}
+    )
+
+
+@app.get("/health")
+async def health():
+    stats = dict(batcher.stats)
+    stats["avg_batch_size"] = round(stats["texts"] / stats["batches"], 2) if stats["batches"] else 0.0
+    return {
+        "status": "healthy",
+        "backend": batcher.backend.name,
+        "model": batcher.backend.model_name,
+        "queued": batcher.queue.qsize(),
+        **stats
+    }
@@ -2,10 +2,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
+import time
 
 from app.config import settings
 from app.api.routes import sites, sources, articles, dashboard
 from app.models.base import engine, Base
+from app.services.http_client import http_clients
+from app.services.redis_client import redis_clients
 # Import all models so they register with Base.metadata
 from app.models import Site, Source, Article
 
@@ -17,6 +20,7 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Create tables
+    started = time.perf_counter()
     logger.info("Starting up - creating database tables...")
     try:
         async with engine.begin() as conn:
@@ -24,9 +28,12 @@ async def lifespan(app: FastAPI):
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Failed to create database tables: {e}")
+    logger.info(f"Startup completed in {(time.perf_counter() - started) * 1000:.0f} ms")
     yield
     # Shutdown
     logger.info("Shutting down...")
+    await http_clients.aclose()
+    await redis_clients.aclose()
     await engine.dispose()
 
 
@@ -1,11 +1,11 @@
 from app.models.base import Base, get_db, engine, async_session
-from app.models.site import Site, VelocityMode
-from app.models.source import Source, SourceType
+from app.models.site import Site, VelocityMode, RewriteMode
+from app.models.source import Source, SourceType, ScrapeMode
 from app.models.article import Article, ArticleStatus, ImageSource
 
 __all__ = [
     "Base", "get_db", "engine", "async_session",
-    "Site", "VelocityMode",
-    "Source", "SourceType", 
+    "Site", "VelocityMode", "RewriteMode",
+    "Source", "SourceType", "ScrapeMode",
     "Article", "ArticleStatus", "ImageSource"
 ]
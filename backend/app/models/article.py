@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, Enum, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, Integer, Enum, ForeignKey, LargeBinary
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -33,6 +33,7 @@ class Article(Base):
     
     # Original content
     original_url = Column(String(1000), nullable=False)
+    url_hash = Column(String(64), nullable=True, unique=True, index=True)  # SHA-256 of normalized original_url
     original_title = Column(Text, nullable=False)
     original_content = Column(Text, nullable=False)
     original_image_url = Column(String(1000), nullable=True)
@@ -52,6 +53,7 @@ class Article(Base):
     
     # Vector DB
     vector_id = Column(String(255), nullable=True)
+    dedup_embedding = Column(LargeBinary, nullable=True)  # float32 ingestion-time embedding
     similarity_score = Column(String(50), nullable=True)
     
     # Image
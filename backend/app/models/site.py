@@ -13,6 +13,11 @@ class VelocityMode(str, enum.Enum):
     EVERGREEN = "evergreen" # 24 hour polling
 
 
+class RewriteMode(str, enum.Enum):
+    SINGLE_PASS = "single_pass"  # Rewrite + translate + SEO in one LLM call
+    TWO_STEP = "two_step"        # Rewrite in source language, then translate (higher quality)
+
+
 class Site(Base):
     __tablename__ = "sites"
     
@@ -25,6 +30,7 @@ class Site(Base):
     bing_cookie = Column(Text, nullable=True)  # Encrypted
     velocity_mode = Column(Enum(VelocityMode), default=VelocityMode.NEWS)
     target_language = Column(String(10), default="en")
+    rewrite_mode = Column(Enum(RewriteMode), default=RewriteMode.TWO_STEP, server_default=RewriteMode.TWO_STEP.name)  # single pass is opt-in
     default_author_id = Column(String(50), nullable=True)
     watermark_text = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True)
@@ -13,6 +13,11 @@ class SourceType(str, enum.Enum):
     URL = "url"
 
 
+class ScrapeMode(str, enum.Enum):
+    STATIC = "static"    # Plain HTTP fetch + HTML parsing
+    BROWSER = "browser"  # Headless Chromium via Playwright
+
+
 class Source(Base):
     __tablename__ = "sources"
     
@@ -28,13 +33,23 @@ class Source(Base):
         "anti_ban": {
             "rotate_user_agent": True,
             "random_delay": True,
-            "use_scraperapi": False
+            "use_scraperapi": False,
+            "block_resources": True
         }
     })
     poll_interval = Column(Integer, default=10)  # minutes
+    current_poll_interval = Column(Integer, nullable=True)  # minutes, adapted to observed yield
+    next_poll_at = Column(DateTime, nullable=True)
     max_articles_per_poll = Column(Integer, default=5)
     is_active = Column(Boolean, default=True)
     last_polled_at = Column(DateTime, nullable=True)
+    scrape_mode = Column(Enum(ScrapeMode), nullable=True)  # Learned fetch mode for URL sources
+    
+    # RSS conditional GET validators
+    etag = Column(String(500), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of last parsed feed entries
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
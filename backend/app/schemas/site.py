@@ -10,12 +10,18 @@ class VelocityMode(str, Enum):
     EVERGREEN = "evergreen"
 
 
+class RewriteMode(str, Enum):
+    SINGLE_PASS = "single_pass"
+    TWO_STEP = "two_step"
+
+
 class SiteBase(BaseModel):
     name: str
     url: str
     wp_username: str
     target_language: str = "en"
     velocity_mode: VelocityMode = VelocityMode.NEWS
+    rewrite_mode: RewriteMode = RewriteMode.TWO_STEP
     category_map: Dict[str, str] = {}
     default_author_id: Optional[str] = None
     watermark_text: Optional[str] = None
@@ -34,6 +40,7 @@ class SiteUpdate(BaseModel):
     wp_app_password: Optional[str] = None
     target_language: Optional[str] = None
     velocity_mode: Optional[VelocityMode] = None
+    rewrite_mode: Optional[RewriteMode] = None
     category_map: Optional[Dict[str, str]] = None
     bing_cookie: Optional[str] = None
     default_author_id: Optional[str] = None
@@ -17,7 +17,8 @@ class ScrapeConfig(BaseModel):
     anti_ban: Dict[str, Any] = {
         "rotate_user_agent": True,
         "random_delay": True,
-        "use_scraperapi": False
+        "use_scraperapi": False,
+        "block_resources": True
     }
 
 
@@ -1,14 +1,36 @@
 from app.services.encryption import encryption_service
+from app.services.http_client import http_clients, HTTPClientRegistry
+from app.services.browser_pool import browser_pool, BrowserPool
+from app.services.scrape_scheduler import scrape_scheduler, ScrapeScheduler
+from app.services.redis_client import redis_clients, RedisClients
+from app.services.seen_urls import seen_url_index, SeenURLIndex
+from app.services.poll_scheduler import poll_scheduler, PollScheduler
+from app.services.embedding_cache import embedding_cache, EmbeddingCache
+from app.services.dedup_prefilter import dedup_prefilter, DedupPrefilter, Fingerprint
 from app.services.vector_store import vector_store
-from app.services.content_ingestor import content_ingestor, ContentIngestor, ScrapedArticle
+from app.services.content_ingestor import content_ingestor, ContentIngestor, ScrapedArticle, FeedFetchResult
+from app.services.llm_cache import llm_cache, LLMResponseCache
+from app.services.model_router import model_router, ModelRouter
+from app.services.rate_limiter import rate_limiter, RateLimiter
 from app.services.ai_processor import ai_processor, AIProcessor
 from app.services.image_pipeline import image_pipeline, ImagePipeline
 from app.services.wordpress_client import WordPressClient
 
 __all__ = [
     "encryption_service",
+    "http_clients", "HTTPClientRegistry",
+    "browser_pool", "BrowserPool",
+    "scrape_scheduler", "ScrapeScheduler",
+    "redis_clients", "RedisClients",
+    "seen_url_index", "SeenURLIndex",
+    "poll_scheduler", "PollScheduler",
+    "embedding_cache", "EmbeddingCache",
+    "dedup_prefilter", "DedupPrefilter", "Fingerprint",
     "vector_store",
-    "content_ingestor", "ContentIngestor", "ScrapedArticle",
+    "content_ingestor", "ContentIngestor", "ScrapedArticle", "FeedFetchResult",
+    "llm_cache", "LLMResponseCache",
+    "model_router", "ModelRouter",
+    "rate_limiter", "RateLimiter",
     "ai_processor", "AIProcessor",
     "image_pipeline", "ImagePipeline",
     "WordPressClient"
@@ -1,11 +1,26 @@
-import httpx
 from langdetect import detect
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Optional, Dict, Any
 from tenacity import retry, stop_after_attempt, wait_exponential
 import json
 import re
 
 from app.config import settings
+from app.services.http_client import http_clients
+from app.services.llm_cache import llm_cache
+from app.services.model_router import model_router
+from app.services.rate_limiter import rate_limiter
+
+
+# Scripts for token estimates: Latin ~4 characters per token, CJK ~1, the
+# rest (Arabic, Cyrillic, Devanagari...) ~2
+_LATIN_CHARS = re.compile(r'[\x00-\u024f]')
+_CJK_CHARS = re.compile(r'[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]')
+
+# Token usage of the API calls made in the current context (see AIProcessor.track_usage)
+_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_usage", default=None)
 
 
 class AIProcessor:
@@ -20,6 +35,16 @@ class AIProcessor:
         self.primary_model = "google/gemini-flash-1.5"
         self.fallback_model = "meta-llama/llama-3.1-70b-instruct"
     
+    @contextmanager
+    def track_usage(self):
+        """Collect call and token counts of every API request made inside the block"""
+        usage = {"calls": 0, "cache_hits": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        token = _usage.set(usage)
+        try:
+            yield usage
+        finally:
+            _usage.reset(token)
+    
     def detect_language(self, text: str) -> str:
         """Detect source language"""
         try:
@@ -27,15 +52,55 @@ class AIProcessor:
         except:
             return "en"
     
+    async def _call_openrouter(
+        self,
+        prompt: str,
+        model: str = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4000,
+        expect_json: bool = False,
+        use_cache: bool = True,
+        retries: bool = True
+    ) -> str:
+        """
+        Call OpenRouter API through the response cache.
+        Only usable responses are cached: non-empty, and parseable when expect_json.
+        With retries=False a failed request raises at once (the router fails over instead).
+        """
+        model = model or self.primary_model
+        params = {"temperature": temperature, "max_tokens": max_tokens}
+        
+        if use_cache and settings.llm_cache_enabled:
+            cached = await llm_cache.get(model, prompt, params)
+            if cached is not None:
+                if _usage.get() is not None:
+                    _usage.get()["cache_hits"] += 1
+                return cached
+        
+        request = self._request_openrouter if retries else self._post_completion
+        content = await request(prompt, model, params)
+        
+        usable = bool(content and content.strip()) and (not expect_json or bool(self._parse_json(content)))
+        if use_cache and settings.llm_cache_enabled and usable:
+            await llm_cache.set(model, prompt, params, content)
+        
+        return content
+    
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    async def _call_openrouter(self, prompt: str, model: str = None) -> str:
-        """Call OpenRouter API"""
+    async def _request_openrouter(self, prompt: str, model: str, params: Dict[str, Any]) -> str:
+        """POST one chat completion, retrying transient failures"""
+        return await self._post_completion(prompt, model, params)
+    
+    async def _post_completion(self, prompt: str, model: str, params: Dict[str, Any]) -> str:
+        """POST one chat completion; the outcome feeds the model router's health"""
         if not self.api_key:
             raise Exception("OpenRouter API key not configured")
         
-        model = model or self.primary_model
+        buckets = ["openrouter", model]
+        await rate_limiter.acquire(buckets)
         
-        async with httpx.AsyncClient() as client:
+        client = http_clients.get("openrouter")
+        async with model_router.observe(model):
             response = await client.post(
                 f"{self.base_url}/chat/completions",
                 headers={
@@ -47,25 +112,33 @@ class AIProcessor:
                 json={
                     "model": model,
                     "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.7,
-                    "max_tokens": 4000
-                },
-                timeout=120
+                    **params
+                }
             )
             
             if response.status_code != 200:
+                await rate_limiter.check_response(buckets, response)
                 raise Exception(f"OpenRouter error: {response.status_code} - {response.text}")
-            
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+        
+        data = response.json()
+        
+        usage = _usage.get()
+        if usage is not None:
+            usage["calls"] += 1
+            usage["prompt_tokens"] += data.get("usage", {}).get("prompt_tokens", 0)
+            usage["completion_tokens"] += data.get("usage", {}).get("completion_tokens", 0)
+        
+        return data["choices"][0]["message"]["content"]
     
-    async def _call_llm(self, prompt: str) -> str:
-        """Call LLM with fallback (Gemini -> Llama)"""
-        try:
-            return await self._call_openrouter(prompt, self.primary_model)
-        except Exception as e:
-            print(f"Primary model failed: {e}, falling back to Llama")
-            return await self._call_openrouter(prompt, self.fallback_model)
+    async def _call_llm(self, prompt: str, expect_json: bool = False, max_tokens: int = 4000) -> str:
+        """Call LLM through the model router (Gemini -> Llama)"""
+        return await model_router.call(
+            [self.primary_model, self.fallback_model],
+            lambda model, last: self._call_openrouter(
+                prompt, model, max_tokens=max_tokens, expect_json=expect_json, retries=last
+            ),
+            max_tokens=max_tokens
+        )
     
     async def rewrite_article(
         self,
@@ -73,12 +146,18 @@ class AIProcessor:
         content: str,
         source_language: str,
         target_language: str,
-        category_map: Dict[str, str] = None
+        category_map: Dict[str, str] = None,
+        mode: str = "two_step"
     ) -> Dict[str, Any]:
         """
-        Rewrite and translate article using the quality-first strategy:
+        Rewrite and translate article.
+        mode "two_step" uses the quality-first strategy:
         1. If source != target: Rewrite in source language first
         2. Then translate to target language
+        mode "single_pass" does rewrite, translation, meta description and
+        category in one structured call.
+        Articles longer than long_article_tokens are rewritten chunk by chunk
+        in parallel whatever the mode (see _rewrite_long).
         """
         
         # Build category selection prompt
@@ -90,6 +169,16 @@ Select the most appropriate category for this article from the following list.
 Available Categories (ID: Name): {categories_list}
 Return ONLY the category ID number."""
         
+        if self._estimate_tokens(content) > settings.long_article_tokens:
+            return await self._rewrite_long(
+                title, content, source_language, target_language, category_map, category_prompt
+            )
+        
+        if mode == "single_pass":
+            return await self._rewrite_single_pass(
+                title, content, source_language, target_language, category_map, category_prompt
+            )
+        
         # Step 1: Rewrite in source language (if different languages)
         if source_language != target_language:
             rewrite_prompt = f"""You are an expert journalist. Rewrite this article in {source_language}.
@@ -108,7 +197,7 @@ Respond with JSON:
 }}"""
             
             try:
-                rewrite_response = await self._call_llm(rewrite_prompt)
+                rewrite_response = await self._call_llm(rewrite_prompt, expect_json=True)
                 rewrite_data = self._parse_json(rewrite_response)
                 title = rewrite_data.get('rewritten_title', title)
                 content = rewrite_data.get('rewritten_content', content)
@@ -137,7 +226,7 @@ Respond with JSON only:
     "category_id": "{list(category_map.keys())[0] if category_map else 'null'}"
 }}"""
         
-        response = await self._call_llm(final_prompt)
+        response = await self._call_llm(final_prompt, expect_json=True)
         result = self._parse_json(response)
         
         return {
@@ -149,6 +238,159 @@ Respond with JSON only:
             "target_language": target_language
         }
     
+    async def _rewrite_single_pass(
+        self,
+        title: str,
+        content: str,
+        source_language: str,
+        target_language: str,
+        category_map: Optional[Dict[str, str]],
+        category_prompt: str
+    ) -> Dict[str, Any]:
+        """Rewrite + translate + SEO + category in one LLM call"""
+        translate = source_language != target_language
+        prompt = f"""You are an expert journalist, content writer{" and translator" if translate else ""}.
+{"Translate this article from " + source_language + " to " + target_language + " and r" if translate else "R"}ewrite it to be SEO-optimized, engaging, and professional.
+Improve the structure, clarity, and flow while preserving all facts and key information.
+Remove any promotional content or bias.
+
+Source Language: {source_language}
+Target Language: {target_language}
+
+Title: {title}
+
+Content:
+{content}
+
+{category_prompt}
+
+Respond with JSON only:
+{{
+    "title": "SEO-optimized title in {target_language}",
+    "content": "Full rewritten article in {target_language}, properly formatted with paragraphs",
+    "meta_description": "Compelling meta description under 160 characters in {target_language}",
+    "category_id": "{list(category_map.keys())[0] if category_map else 'null'}"
+}}"""
+        
+        response = await self._call_llm(prompt, expect_json=True)
+        result = self._parse_json(response)
+        
+        return {
+            "title": result.get("title", title),
+            "content": result.get("content", content),
+            "meta_description": result.get("meta_description", ""),
+            "category_id": result.get("category_id"),
+            "source_language": source_language,
+            "target_language": target_language
+        }
+    
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Rough token count from per-script character ratios (see _LATIN_CHARS)"""
+        text = text or ""
+        latin = len(_LATIN_CHARS.findall(text))
+        cjk = len(_CJK_CHARS.findall(text))
+        return round(latin / 4 + (len(text) - latin - cjk) / 2 + cjk)
+    
+    def _split_chunks(self, content: str, budget: int):
+        """Split content on paragraph (then sentence) boundaries into chunks of about budget tokens"""
+        pieces = []
+        for paragraph in (p.strip() for p in content.split("\n")):
+            if not paragraph:
+                continue
+            if self._estimate_tokens(paragraph) <= budget:
+                pieces.append(paragraph)
+                continue
+            
+            # CJK full stops are not followed by a space
+            for sentence in re.split(r'(?<=[.!?؟])\s+|(?<=[。！？])', paragraph):
+                tokens = self._estimate_tokens(sentence)
+                if tokens > budget:
+                    # No usable boundary: cut by length
+                    step = max(1, len(sentence) * budget // tokens)
+                    pieces.extend(sentence[i:i + step] for i in range(0, len(sentence), step))
+                elif sentence:
+                    pieces.append(sentence)
+        
+        chunks, current, size = [], [], 0
+        for piece in pieces:
+            tokens = self._estimate_tokens(piece)
+            if current and size + tokens > budget:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += tokens
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+    
+    async def _rewrite_long(
+        self,
+        title: str,
+        content: str,
+        source_language: str,
+        target_language: str,
+        category_map: Optional[Dict[str, str]],
+        category_prompt: str
+    ) -> Dict[str, Any]:
+        """
+        Map-reduce rewrite for long articles: token-budgeted chunks are
+        rewritten/translated concurrently (bounded by rewrite_chunk_concurrency),
+        then a short final pass writes title, meta description and category.
+        A failed chunk fails the article; finished chunks stay in the LLM cache.
+        """
+        chunks = self._split_chunks(content, settings.rewrite_chunk_tokens)
+        semaphore = asyncio.Semaphore(settings.rewrite_chunk_concurrency)
+        translate = source_language != target_language
+        
+        async def rewrite_chunk(index: int, chunk: str) -> str:
+            prompt = f"""You are an expert journalist{" and translator" if translate else ""}.
+This is part {index + 1} of {len(chunks)} of the article "{title}".
+{"Translate this part from " + source_language + " to " + target_language + " and r" if translate else "R"}ewrite it to be clear, engaging, and professional.
+Preserve all facts and key information and remove any promotional content or bias.
+Do not add an introduction, conclusion or title of your own.
+
+Part:
+{chunk}
+
+Respond with only the rewritten part in {target_language}, as plain paragraphs."""
+            async with semaphore:
+                return (await self._call_llm(prompt, max_tokens=settings.rewrite_chunk_max_tokens)).strip()
+        
+        parts = await asyncio.gather(*(rewrite_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+        rewritten = "\n\n".join(part for part in parts if part)
+        
+        final_prompt = f"""You are an SEO editor. Based on this article, write its metadata in {target_language}.
+
+Original Title: {title}
+
+Article excerpt:
+{rewritten[:3000]}
+
+{category_prompt}
+
+Respond with JSON only:
+{{
+    "title": "SEO-optimized title in {target_language}",
+    "meta_description": "Compelling meta description under 160 characters in {target_language}",
+    "category_id": "{list(category_map.keys())[0] if category_map else 'null'}"
+}}"""
+        
+        try:
+            result = self._parse_json(await self._call_llm(final_prompt, expect_json=True, max_tokens=500))
+        except Exception as e:
+            print(f"Long article metadata step failed: {e}")
+            result = {}
+        
+        return {
+            "title": result.get("title", title),
+            "content": rewritten or content,
+            "meta_description": result.get("meta_description", ""),
+            "category_id": result.get("category_id"),
+            "source_language": source_language,
+            "target_language": target_language
+        }
+    
     async def generate_image_prompt(self, title: str, content: str) -> str:
         """Generate an image prompt from article content"""
         prompt = f"""Based on this article, create a short, descriptive image prompt for AI image generation.
@@ -185,7 +427,7 @@ Respond with JSON:
     "reason": "explanation"
 }}"""
             
-            response = await self._call_openrouter(prompt, "google/gemini-flash-1.5")
+            response = await self._call_openrouter(prompt, "google/gemini-flash-1.5", expect_json=True)
             return self._parse_json(response)
             
         except Exception as e:
@@ -0,0 +1,227 @@
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Set
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+from playwright_stealth import stealth_async
+
+from app.config import settings
+
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Mobile/15E148 Safari/604.1",
+]
+
+VIEWPORTS = [
+    {"width": 1920, "height": 1080},
+    {"width": 1366, "height": 768},
+    {"width": 1536, "height": 864},
+    {"width": 1440, "height": 900},
+    {"width": 2560, "height": 1440},
+]
+
+# Anti-ban profiles: each gets one long-lived browser context
+PROFILES = list(zip(USER_AGENTS, VIEWPORTS))
+
+# Ad/tracker hosts never needed to read article text (subdomains included)
+BLOCKED_DOMAINS = {
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com",
+    "adservice.google.com", "facebook.net", "scorecardresearch.com",
+    "quantserve.com", "taboola.com", "outbrain.com", "criteo.com",
+    "amazon-adsystem.com", "adnxs.com", "pubmatic.com", "rubiconproject.com",
+    "moatads.com", "hotjar.com", "chartbeat.com", "nr-data.net",
+    "segment.io", "optimizely.com", "adsafeprotected.com", "openx.net",
+}
+
+
+def _parse_list(value) -> Set[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    return {v.strip().lower() for v in value or [] if v and v.strip()}
+
+
+def build_resource_policy(anti_ban_config: Optional[dict]):
+    """
+    Resolve which requests to abort for a page.
+    Per-source overrides in anti_ban: block_resources (bool),
+    blocked_resource_types (list) and blocked_domains (extra hosts).
+    Returns (resource_types, domains) or None when blocking is disabled.
+    """
+    config = anti_ban_config or {}
+    if not config.get('block_resources', settings.browser_block_resources):
+        return None
+    
+    resource_types = _parse_list(
+        config.get('blocked_resource_types', settings.browser_blocked_resource_types)
+    )
+    domains = BLOCKED_DOMAINS | _parse_list(config.get('blocked_domains'))
+    return resource_types, domains
+
+
+def _is_blocked_host(host: Optional[str], domains: Set[str]) -> bool:
+    if not host:
+        return False
+    host = host.lower()
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class BrowserPool:
+    """
+    Per-process Chromium pool for URL scraping.
+    Keeps one browser alive across tasks, reuses one context per anti-ban
+    profile, bounds concurrent pages and recycles the browser after N pages.
+    """
+    
+    def __init__(self, max_pages: int = None, recycle_after: int = None):
+        self.max_pages = max_pages or settings.browser_max_pages
+        self.recycle_after = recycle_after or settings.browser_recycle_after_pages
+        self._reset()
+    
+    def _reset(self):
+        self._loop = None
+        self._playwright = None
+        self._browser = None
+        self._contexts: Dict[int, object] = {}
+        self._semaphore = None
+        self._lock = None
+        self._active_pages = 0
+        self._pages_served = 0
+    
+    def _bind_loop(self):
+        """Resources are tied to the loop they were created on - start over on a new loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._reset()
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_pages)
+            self._lock = asyncio.Lock()
+    
+    def _is_healthy(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+    
+    async def _launch(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        
+        self._browser = await self._playwright.chromium.launch(
+            headless=True,
+            args=['--disable-blink-features=AutomationControlled']
+        )
+        self._contexts = {}
+        self._pages_served = 0
+    
+    async def _close_browser(self):
+        for context in self._contexts.values():
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self._contexts = {}
+        
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        self._browser = None
+    
+    async def _get_context(self, profile_index: int):
+        async with self._lock:
+            if not self._is_healthy():
+                await self._close_browser()
+                await self._launch()
+            
+            context = self._contexts.get(profile_index)
+            if context is None:
+                user_agent, viewport = PROFILES[profile_index]
+                context = await self._browser.new_context(
+                    user_agent=user_agent,
+                    viewport=viewport,
+                    locale='en-US',
+                    timezone_id='America/New_York'
+                )
+                self._contexts[profile_index] = context
+            
+            return context
+    
+    async def _maybe_recycle(self):
+        async with self._lock:
+            if self._active_pages == 0 and self._pages_served >= self.recycle_after:
+                await self._close_browser()
+    
+    def _pick_profile(self, anti_ban_config: Optional[dict]) -> int:
+        config = anti_ban_config or {}
+        if config.get('rotate_user_agent', True):
+            return random.randrange(len(PROFILES))
+        return 0
+    
+    async def _apply_resource_policy(self, page, anti_ban_config: Optional[dict]):
+        policy = build_resource_policy(anti_ban_config)
+        if policy is None:
+            return
+        resource_types, domains = policy
+        
+        async def handle(route):
+            request = route.request
+            if request.resource_type in resource_types or _is_blocked_host(urlparse(request.url).hostname, domains):
+                await route.abort()
+            else:
+                await route.continue_()
+        
+        await page.route("**/*", handle)
+    
+    @asynccontextmanager
+    async def page(self, anti_ban_config: dict = None):
+        """Yield a stealth page from a pooled context, closing it afterwards"""
+        self._bind_loop()
+        profile_index = self._pick_profile(anti_ban_config)
+        
+        async with self._semaphore:
+            context = await self._get_context(profile_index)
+            try:
+                page = await context.new_page()
+            except Exception:
+                # Context died with the browser - drop it and retry once
+                self._contexts.pop(profile_index, None)
+                context = await self._get_context(profile_index)
+                page = await context.new_page()
+            
+            self._active_pages += 1
+            try:
+                await stealth_async(page)
+                # Routing is per page so sources with different policies share contexts
+                await self._apply_resource_policy(page, anti_ban_config)
+                yield page
+            finally:
+                self._active_pages -= 1
+                self._pages_served += 1
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+        
+        await self._maybe_recycle()
+    
+    async def close(self):
+        """Shut down the browser and Playwright for the current loop"""
+        if self._loop is not asyncio.get_running_loop():
+            self._reset()
+            return
+        
+        await self._close_browser()
+        if self._playwright:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._reset()
+
+
+browser_pool = BrowserPool()
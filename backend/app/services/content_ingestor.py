@@ -1,33 +1,18 @@
 import asyncio
 import random
-import feedparser
-from playwright.async_api import async_playwright
-from playwright_stealth import stealth_async
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
-import httpx
+from typing import AsyncIterator, List, Dict, Any, Optional
+from dataclasses import dataclass, field
 from tenacity import retry, stop_after_attempt, wait_exponential
+import hashlib
+import json
 import re
 
 from app.config import settings
-
-
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Mobile/15E148 Safari/604.1",
-]
-
-VIEWPORTS = [
-    {"width": 1920, "height": 1080},
-    {"width": 1366, "height": 768},
-    {"width": 1536, "height": 864},
-    {"width": 1440, "height": 900},
-    {"width": 2560, "height": 1440},
-]
+from app.services.http_client import http_clients
+from app.services.browser_pool import browser_pool, USER_AGENTS
+from app.services.scrape_scheduler import scrape_scheduler
+from app.services.feed_stream import FeedStreamParser, parse_entries_with_feedparser
 
 
 @dataclass
@@ -37,145 +22,241 @@ class ScrapedArticle:
     content: str
     image_url: Optional[str] = None
     published_date: Optional[str] = None
+    fetch_mode: Optional[str] = None  # 'static', 'browser' or 'scraperapi' for URL scrapes
+
+
+@dataclass
+class FeedFetchResult:
+    """Result of a conditional RSS fetch, with the validators to persist on the Source"""
+    articles: List[ScrapedArticle] = field(default_factory=list)
+    not_modified: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
 
 
 class ContentIngestor:
-    def __init__(self):
-        self.browser = None
-        self.context = None
-    
-    async def _init_browser(self):
-        if not self.browser:
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(
-                headless=True,
-                args=['--disable-blink-features=AutomationControlled']
-            )
-    
-    async def _get_context(self, anti_ban_config: dict = None):
-        await self._init_browser()
-        
-        config = anti_ban_config or {}
-        user_agent = random.choice(USER_AGENTS) if config.get('rotate_user_agent', True) else USER_AGENTS[0]
-        viewport = random.choice(VIEWPORTS)
-        
-        context = await self.browser.new_context(
-            user_agent=user_agent,
-            viewport=viewport,
-            locale='en-US',
-            timezone_id='America/New_York'
-        )
-        
-        return context
-    
     # RSS Feed Parsing
-    async def parse_rss(self, feed_url: str, max_items: int = 10) -> List[ScrapedArticle]:
-        """Parse RSS feed and return articles"""
-        articles = []
+    async def parse_rss(
+        self,
+        feed_url: str,
+        max_items: int = 10,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> FeedFetchResult:
+        """
+        Parse RSS feed and return articles.
+        Sends If-None-Match/If-Modified-Since from the stored validators and
+        stops early on a 304 or when the entries hash matches the previous poll.
+        The body is streamed and parsed incrementally, and reading stops after
+        max_items entries or settings.rss_max_bytes, whichever comes first.
+        """
+        result = FeedFetchResult(etag=etag, last_modified=last_modified, content_hash=content_hash)
+        
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(feed_url, timeout=30)
-                feed = feedparser.parse(response.text)
-            
-            for entry in feed.entries[:max_items]:
-                # Extract content
-                content = ""
-                if hasattr(entry, 'content'):
-                    content = entry.content[0].value
-                elif hasattr(entry, 'summary'):
-                    content = entry.summary
-                elif hasattr(entry, 'description'):
-                    content = entry.description
+            client = http_clients.get("feeds")
+            async with client.stream("GET", feed_url, headers=headers) as response:
+                if response.status_code == 304:
+                    result.not_modified = True
+                    return result
+                response.raise_for_status()
                 
-                # Clean HTML
-                soup = BeautifulSoup(content, 'lxml')
-                clean_content = soup.get_text(separator='\n', strip=True)
+                result.etag = response.headers.get("ETag")
+                result.last_modified = response.headers.get("Last-Modified")
                 
-                # Extract image
-                image_url = None
-                if hasattr(entry, 'media_content'):
-                    image_url = entry.media_content[0].get('url')
-                elif hasattr(entry, 'media_thumbnail'):
-                    image_url = entry.media_thumbnail[0].get('url')
-                else:
-                    # Try to find image in content
-                    img_tag = soup.find('img')
-                    if img_tag:
-                        image_url = img_tag.get('src')
+                # Read only until max_items entries are parsed or the byte cap is hit
+                parser = FeedStreamParser(max_items)
+                body = bytearray()
                 
-                articles.append(ScrapedArticle(
-                    url=entry.get('link', ''),
-                    title=entry.get('title', 'Untitled'),
-                    content=clean_content,
-                    image_url=image_url,
-                    published_date=entry.get('published', None)
-                ))
+                async for chunk in response.aiter_bytes():
+                    remaining = settings.rss_max_bytes - len(body)
+                    chunk = chunk[:remaining]
+                    body.extend(chunk)
+                    
+                    if parser.feed(chunk) or len(body) >= settings.rss_max_bytes:
+                        break
+                else:
+                    # Whole body read: a parse that stopped early is a failure
+                    parser.close()
+            
+            entries = parser.entries
+            if parser.failed or not entries:
+                entries = parse_entries_with_feedparser(bytes(body), max_items)
+            entries = entries[:max_items]
+            
+            # Hash of the kept entries (the body may be only partially read).
+            # Fallback for servers that ignore conditional requests.
+            entries_hash = hashlib.sha256(
+                json.dumps(entries, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            result.content_hash = entries_hash
+            if content_hash and entries_hash == content_hash:
+                result.not_modified = True
+                return result
+            
+            # HTML cleaning only runs on the entries we keep
+            for entry in entries:
+                result.articles.append(self._feed_entry_to_article(entry))
             
         except Exception as e:
             print(f"RSS parsing error: {e}")
+            # Keep previous validators so the next poll is not forced to refetch
+            result = FeedFetchResult(etag=etag, last_modified=last_modified, content_hash=content_hash)
         
-        return articles
+        return result
     
-    # Direct URL Scraping with Playwright
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    def _feed_entry_to_article(self, entry: Dict[str, Any]) -> ScrapedArticle:
+        # Clean HTML
+        soup = BeautifulSoup(entry["content"], 'lxml')
+        clean_content = soup.get_text(separator='\n', strip=True)
+        
+        # Extract image
+        image_url = entry["image_url"]
+        if not image_url:
+            # Try to find image in content
+            img_tag = soup.find('img')
+            if img_tag:
+                image_url = img_tag.get('src')
+        
+        return ScrapedArticle(
+            url=entry["link"],
+            title=entry["title"],
+            content=clean_content,
+            image_url=image_url,
+            published_date=entry["published"]
+        )
+    
+    # Direct URL Scraping
     async def scrape_url(
-        self, 
-        url: str, 
-        scrape_config: dict = None
+        self,
+        url: str,
+        scrape_config: dict = None,
+        mode: Optional[str] = None
     ) -> Optional[ScrapedArticle]:
-        """Scrape article from URL using Playwright with stealth"""
+        """
+        Scrape article from URL.
+        Tries a plain HTTP fetch first and falls back to Playwright when the
+        extracted content is empty or too short. Pass mode='browser' to skip
+        the static attempt for sources known to need JavaScript.
+        """
         config = scrape_config or {}
-        anti_ban = config.get('anti_ban', {})
         
-        context = await self._get_context(anti_ban)
-        page = await context.new_page()
+        if mode != 'browser':
+            article = await self._scrape_static(url, config)
+            if article and len(article.content) >= settings.static_scrape_min_content_length:
+                return article
+        
+        return await self._scrape_with_browser(url, config)
+    
+    async def _scrape_static(self, url: str, config: dict) -> Optional[ScrapedArticle]:
+        """Fetch the initial HTML without a browser and extract with the source selectors"""
+        anti_ban = config.get('anti_ban', {})
+        user_agent = random.choice(USER_AGENTS) if anti_ban.get('rotate_user_agent', True) else USER_AGENTS[0]
         
         try:
-            # Apply stealth
-            await stealth_async(page)
-            
-            # Random delay
-            if anti_ban.get('random_delay', True):
-                await asyncio.sleep(random.uniform(1, 3))
+            client = http_clients.get("scrape")
+            response = await client.get(
+                url,
+                headers={
+                    "User-Agent": user_agent,
+                    "Accept": "text/html,application/xhtml+xml",
+                    "Accept-Language": "en-US,en;q=0.9"
+                },
+                follow_redirects=True
+            )
+            if response.status_code != 200:
+                return None
             
-            # Navigate
-            await page.goto(url, wait_until='domcontentloaded', timeout=30000)
-            await page.wait_for_timeout(2000)  # Wait for dynamic content
+            soup = BeautifulSoup(response.content, 'lxml')
             
             # Extract title
-            title_selector = config.get('title_selector', 'h1')
-            title_element = await page.query_selector(title_selector)
-            title = await title_element.inner_text() if title_element else "Untitled"
+            title_element = soup.select_one(config.get('title_selector', 'h1'))
+            title = title_element.get_text(strip=True) if title_element else "Untitled"
             
             # Extract content
-            content_selector = config.get('content_selector', 'article')
-            content_element = await page.query_selector(content_selector)
-            
+            content_element = soup.select_one(config.get('content_selector', 'article'))
             if content_element:
-                content_html = await content_element.inner_html()
-                soup = BeautifulSoup(content_html, 'lxml')
-                
-                # Remove unwanted elements
-                for element in soup.find_all(['script', 'style', 'nav', 'footer', 'aside', 'iframe']):
+                for element in content_element.find_all(['script', 'style', 'nav', 'footer', 'aside', 'iframe']):
                     element.decompose()
-                
-                content = soup.get_text(separator='\n', strip=True)
+                content = content_element.get_text(separator='\n', strip=True)
             else:
                 content = ""
             
             # Extract image
             image_url = None
-            image_selector = config.get('image_selector', 'article img')
-            image_element = await page.query_selector(image_selector)
+            image_element = soup.select_one(config.get('image_selector', 'article img'))
             if image_element:
-                image_url = await image_element.get_attribute('src')
+                image_url = image_element.get('src')
+            
+            return ScrapedArticle(
+                url=url,
+                title=title,
+                content=content,
+                image_url=image_url,
+                fetch_mode='static'
+            )
+            
+        except Exception as e:
+            print(f"Static scraping error for {url}: {e}")
+            return None
+    
+    # Playwright scraping with stealth
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    async def _scrape_with_browser(self, url: str, config: dict) -> Optional[ScrapedArticle]:
+        """Scrape article from URL using Playwright with stealth"""
+        anti_ban = config.get('anti_ban', {})
+        
+        try:
+            async with browser_pool.page(anti_ban) as page:
+                # Random delay
+                if anti_ban.get('random_delay', True):
+                    await asyncio.sleep(random.uniform(1, 3))
+                
+                # Navigate
+                await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+                await page.wait_for_timeout(2000)  # Wait for dynamic content
+                
+                # Extract title
+                title_selector = config.get('title_selector', 'h1')
+                title_element = await page.query_selector(title_selector)
+                title = await title_element.inner_text() if title_element else "Untitled"
+                
+                # Extract content
+                content_selector = config.get('content_selector', 'article')
+                content_element = await page.query_selector(content_selector)
+                
+                if content_element:
+                    content_html = await content_element.inner_html()
+                    soup = BeautifulSoup(content_html, 'lxml')
+                    
+                    # Remove unwanted elements
+                    for element in soup.find_all(['script', 'style', 'nav', 'footer', 'aside', 'iframe']):
+                        element.decompose()
+                    
+                    content = soup.get_text(separator='\n', strip=True)
+                else:
+                    content = ""
+                
+                # Extract image
+                image_url = None
+                image_selector = config.get('image_selector', 'article img')
+                image_element = await page.query_selector(image_selector)
+                if image_element:
+                    image_url = await image_element.get_attribute('src')
             
             return ScrapedArticle(
                 url=url,
                 title=title.strip(),
                 content=content,
-                image_url=image_url
+                image_url=image_url,
+                fetch_mode='browser'
             )
             
         except Exception as e:
@@ -186,19 +267,28 @@ class ContentIngestor:
                 return await self._scrape_with_scraperapi(url, config)
             
             return None
+    
+    async def scrape_urls(
+        self,
+        urls: List[str],
+        scrape_config: dict = None,
+        mode: Optional[str] = None
+    ) -> AsyncIterator[ScrapedArticle]:
+        """Scrape many URLs concurrently (throttled per domain), yielding articles as they complete"""
+        async def fetch(url: str) -> Optional[ScrapedArticle]:
+            return await self.scrape_url(url, scrape_config, mode)
         
-        finally:
-            await page.close()
-            await context.close()
+        async for article in scrape_scheduler.run(urls, fetch):
+            yield article
     
     async def _scrape_with_scraperapi(self, url: str, config: dict) -> Optional[ScrapedArticle]:
         """Fallback scraping using ScraperAPI"""
         try:
             api_url = f"http://api.scraperapi.com?api_key={settings.scraperapi_key}&url={url}&render=true"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(api_url, timeout=60)
-                html = response.text
+            client = http_clients.get("scraperapi")
+            response = await client.get(api_url)
+            html = response.text
             
             soup = BeautifulSoup(html, 'lxml')
             
@@ -225,47 +315,42 @@ class ContentIngestor:
                 url=url,
                 title=title,
                 content=content,
-                image_url=image_url
+                image_url=image_url,
+                fetch_mode='scraperapi'
             )
             
         except Exception as e:
             print(f"ScraperAPI error: {e}")
             return None
     
-    async def scrape_links_from_page(self, root_url: str, link_selector: str = "a") -> List[str]:
+    async def scrape_links_from_page(self, root_url: str, link_selector: str = "a", scrape_config: dict = None) -> List[str]:
         """Extract article links from a root page"""
-        context = await self._get_context()
-        page = await context.new_page()
+        anti_ban = (scrape_config or {}).get('anti_ban', {})
         links = []
         
         try:
-            await stealth_async(page)
-            await page.goto(root_url, wait_until='domcontentloaded', timeout=30000)
-            await page.wait_for_timeout(2000)
-            
-            elements = await page.query_selector_all(link_selector)
-            
-            for element in elements:
-                href = await element.get_attribute('href')
-                if href and not href.startswith('#'):
-                    # Make absolute URL
-                    if href.startswith('/'):
-                        from urllib.parse import urljoin
-                        href = urljoin(root_url, href)
-                    links.append(href)
+            async with browser_pool.page(anti_ban) as page:
+                await page.goto(root_url, wait_until='domcontentloaded', timeout=30000)
+                await page.wait_for_timeout(2000)
+                
+                elements = await page.query_selector_all(link_selector)
+                
+                for element in elements:
+                    href = await element.get_attribute('href')
+                    if href and not href.startswith('#'):
+                        # Make absolute URL
+                        if href.startswith('/'):
+                            from urllib.parse import urljoin
+                            href = urljoin(root_url, href)
+                        links.append(href)
             
         except Exception as e:
             print(f"Link extraction error: {e}")
         
-        finally:
-            await page.close()
-            await context.close()
-        
         return list(set(links))  # Remove duplicates
     
     async def close(self):
-        if self.browser:
-            await self.browser.close()
+        await browser_pool.close()
 
 
 content_ingestor = ContentIngestor()
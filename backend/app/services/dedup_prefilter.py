@@ -0,0 +1,170 @@
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from app.config import settings
+from app.services.redis_client import redis_clients
+from app.utils.fingerprint import content_tokens, content_sha, simhash, simhash_bands, hamming_distance, SIMHASH_BITS
+
+
+@dataclass
+class Fingerprint:
+    # Both None when the text is too short to compare reliably
+    sha: Optional[str]
+    simhash: Optional[int]
+
+
+class DedupPrefilter:
+    """
+    Cheap duplicate check run before the embedding model.
+    Exact copies are caught by a normalized-content SHA, near copies by a
+    64-bit SimHash looked up through LSH bands (sorted sets scored by time).
+    Anything not resolved here goes on to VectorStore.check_duplicates,
+    including texts under simhash_min_tokens: short teasers and boilerplate
+    collide too often to call them copies without the embedding model.
+    
+    Matches follow the same scope as the vector query: only articles indexed
+    within dedup_window_days, and only from the same site when
+    dedup_site_scoped. Entries are written to both the global and the site
+    scope so the setting can be flipped without a cold index.
+    """
+    
+    SHA_PREFIX = "empire:dedup:sha"
+    BAND_PREFIX = "empire:dedup:band"
+    
+    def __init__(self, max_distance: int = None, ttl_days: int = None):
+        self.max_distance = max_distance if max_distance is not None else settings.simhash_max_distance
+        self.bands = self.max_distance + 1
+        self.ttl_days = ttl_days or settings.dedup_index_ttl_days
+    
+    @property
+    def ttl_seconds(self) -> int:
+        return self.ttl_days * 24 * 3600
+    
+    @property
+    def window_seconds(self) -> int:
+        return min(settings.dedup_window_days, self.ttl_days) * 24 * 3600
+    
+    @staticmethod
+    def _scope(site_id: Optional[str]) -> str:
+        return site_id if settings.dedup_site_scoped and site_id else "all"
+    
+    def fingerprint(self, title: str, content: str) -> Fingerprint:
+        tokens = content_tokens(content or title)
+        if len(tokens) < settings.simhash_min_tokens:
+            return Fingerprint(sha=None, simhash=None)
+        return Fingerprint(sha=content_sha(f"{title or ''} {content or ''}"), simhash=simhash(tokens))
+    
+    def _sha_key(self, scope: str, sha: str) -> str:
+        return f"{self.SHA_PREFIX}:{scope}:{sha}"
+    
+    def _band_keys(self, scope: str, fingerprint: int) -> List[str]:
+        return [
+            f"{self.BAND_PREFIX}:{scope}:{i}:{value:x}"
+            for i, value in enumerate(simhash_bands(fingerprint, self.bands))
+        ]
+    
+    def check(
+        self,
+        items: List[Tuple[str, str]],
+        site_id: str = None,
+        earlier: List[Tuple[str, Fingerprint]] = None
+    ) -> Tuple[List[Fingerprint], List[Optional[Tuple[Optional[str], float]]]]:
+        """
+        Fingerprint (title, content) pairs and resolve obvious duplicates.
+        Returns the fingerprints and, per item, (existing_id, similarity) for a
+        duplicate or None when undecided. existing_id is None for a copy of an
+        earlier item in the same batch. earlier holds (article_id, fingerprint)
+        pairs stored by previous batches of the same poll and not yet indexed.
+        Fails open if Redis is down.
+        """
+        fingerprints = [self.fingerprint(title, content) for title, content in items]
+        matches: List[Optional[Tuple[Optional[str], float]]] = [None] * len(items)
+        scope = self._scope(site_id)
+        
+        try:
+            redis = redis_clients.get_sync()
+            pipe = redis.pipeline(transaction=False)
+            cutoff = time.time() - self.window_seconds
+            for fp in fingerprints:
+                if fp.sha is not None:
+                    pipe.get(self._sha_key(scope, fp.sha))
+                for key in self._band_keys(scope, fp.simhash) if fp.simhash is not None else []:
+                    pipe.zrangebyscore(key, cutoff, "+inf")
+            replies = iter(pipe.execute())
+            
+            for i, fp in enumerate(fingerprints):
+                existing = next(replies) if fp.sha is not None else None
+                candidates = set()
+                for _ in range(self.bands if fp.simhash is not None else 0):
+                    candidates.update(next(replies))
+                
+                # SHA entries are "<indexed_at>:<article_id>"
+                if existing is not None:
+                    indexed_at, article_id = existing.decode().split(":", 1)
+                    if float(indexed_at) >= cutoff:
+                        matches[i] = (article_id, 1.0)
+                        continue
+                
+                matches[i] = self._closest(fp.simhash, candidates)
+        except Exception as e:
+            print(f"Dedup prefilter lookup error: {e}")
+        
+        # Copies of earlier batches of the poll, then within the batch itself
+        for i, fp in enumerate(fingerprints):
+            if matches[i] is not None:
+                continue
+            others = list(earlier or []) + [(None, fingerprints[j]) for j in range(i) if matches[j] is None]
+            for article_id, other in others:
+                matches[i] = self._compare(fp, other, article_id)
+                if matches[i] is not None:
+                    break
+        
+        return fingerprints, matches
+    
+    def _compare(self, fp: Fingerprint, other: Fingerprint, article_id: Optional[str]) -> Optional[Tuple[Optional[str], float]]:
+        if fp.sha is not None and fp.sha == other.sha:
+            return article_id, 1.0
+        if fp.simhash is not None and other.simhash is not None:
+            distance = hamming_distance(fp.simhash, other.simhash)
+            if distance <= self.max_distance:
+                return article_id, 1 - distance / SIMHASH_BITS
+        return None
+    
+    def _closest(self, fingerprint: Optional[int], candidates) -> Optional[Tuple[str, float]]:
+        best = None
+        for member in candidates:
+            value, article_id = member.decode().split(":", 1)
+            distance = hamming_distance(fingerprint, int(value, 16))
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, article_id)
+        
+        if best is None:
+            return None
+        return best[1], 1 - best[0] / SIMHASH_BITS
+    
+    def add(self, entries: List[Tuple[str, Fingerprint]], site_id: str = None) -> None:
+        """Index (article_id, fingerprint) pairs of newly stored originals of a site"""
+        if not entries:
+            return
+        
+        scopes = ["all"] + ([site_id] if site_id else [])
+        try:
+            now = time.time()
+            pipe = redis_clients.get_sync().pipeline(transaction=False)
+            for article_id, fp in entries:
+                for scope in scopes:
+                    if fp.sha is not None:
+                        pipe.set(self._sha_key(scope, fp.sha), f"{now}:{article_id}", ex=self.ttl_seconds)
+                    if fp.simhash is None:
+                        continue
+                    for key in self._band_keys(scope, fp.simhash):
+                        pipe.zadd(key, {f"{fp.simhash:x}:{article_id}": now})
+                        pipe.zremrangebyscore(key, "-inf", now - self.ttl_seconds)
+                        pipe.expire(key, self.ttl_seconds)
+            pipe.execute()
+        except Exception as e:
+            print(f"Dedup prefilter update error: {e}")
+
+
+dedup_prefilter = DedupPrefilter()
@@ -0,0 +1,212 @@
+import json
+import os
+from typing import Dict, List
+
+import numpy as np
+
+from app.config import settings
+
+
+class EmbeddingBackend:
+    """Turns texts into float32 sentence embeddings"""
+    
+    name = "base"
+    
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+    
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        raise NotImplementedError
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """PyTorch inference through sentence-transformers (the reference implementation)"""
+    
+    name = "torch"
+    
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        from sentence_transformers import SentenceTransformer
+        
+        self.model = SentenceTransformer(model_name)
+    
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    int8-quantized ONNX export of the same model run with onnxruntime on CPU.
+    Mean pooling + L2 normalization reproduce the sentence-transformers
+    pipeline; neither torch nor transformers is imported.
+    """
+    
+    name = "onnx-int8"
+    MODEL_FILE = "model_int8.onnx"
+    CONFIG_FILE = "embedding_config.json"
+    
+    def __init__(self, model_name: str, model_dir: str):
+        super().__init__(model_name)
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        
+        with open(os.path.join(model_dir, self.CONFIG_FILE)) as f:
+            config = json.load(f)
+        if config.get("model_name") != model_name:
+            raise ValueError(f"ONNX export in {model_dir} is for {config.get('model_name')}, not {model_name}")
+        
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=config["max_length"])
+        if self.tokenizer.padding is None:
+            self.tokenizer.enable_padding()
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if settings.onnx_num_threads:
+            options.intra_op_num_threads = settings.onnx_num_threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, self.MODEL_FILE),
+            options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+    
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        # Length-sorted batches keep padding (and wasted compute) small
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        output = [None] * len(texts)
+        
+        for start in range(0, len(texts), batch_size):
+            batch = order[start:start + batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in batch])
+            inputs: Dict[str, np.ndarray] = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64)
+            }
+            hidden = self.session.run(None, {k: v for k, v in inputs.items() if k in self.input_names})[0]
+            
+            mask = inputs["attention_mask"][:, :, None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            
+            for i, vector in zip(batch, pooled):
+                output[i] = vector
+        
+        return np.vstack(output).astype(np.float32, copy=False)
+
+
+class RemoteBackend(EmbeddingBackend):
+    """
+    Client for the shared embedding server (app.embedding_server), so worker
+    processes hold no model of their own and their requests get batched together.
+    """
+    
+    name = "remote"
+    
+    def __init__(self, model_name: str, url: str):
+        super().__init__(model_name)
+        import httpx
+        
+        self.client = httpx.Client(
+            base_url=url,
+            timeout=settings.embedding_server_timeout,
+            transport=httpx.HTTPTransport(retries=2)
+        )
+    
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        response = self.client.post("/embed", json={"texts": texts})
+        response.raise_for_status()
+        
+        dim = int(response.headers["X-Embedding-Dim"])
+        if not dim:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.frombuffer(response.content, dtype='<f4').reshape(-1, dim)
+
+
+def export_onnx(model_name: str, model_dir: str) -> str:
+    """Export the transformer of a sentence-transformers model to ONNX and quantize it to int8"""
+    import torch
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from sentence_transformers import SentenceTransformer
+    
+    os.makedirs(model_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    model.tokenizer.save_pretrained(model_dir)
+    
+    sample = model.tokenizer(["export sample"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    fp32_path = os.path.join(model_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in names),
+            fp32_path,
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in names + ["last_hidden_state"]},
+            opset_version=14
+        )
+    
+    int8_path = os.path.join(model_dir, OnnxBackend.MODEL_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    
+    with open(os.path.join(model_dir, OnnxBackend.CONFIG_FILE), "w") as f:
+        json.dump({"model_name": model_name, "max_length": model.max_seq_length}, f)
+    
+    return int8_path
+
+
+def parity_report(reference: EmbeddingBackend, candidate: EmbeddingBackend, texts: List[str], threshold: float = None) -> Dict[str, float]:
+    """
+    Compare two backends on the same texts. Besides vector agreement this
+    counts text pairs whose duplicate decision (similarity >= threshold)
+    would differ, which is what dedup actually depends on.
+    """
+    threshold = threshold if threshold is not None else settings.similarity_threshold
+    a = _normalized(reference.encode(texts, settings.embedding_batch_size))
+    b = _normalized(candidate.encode(texts, settings.embedding_batch_size))
+    
+    self_similarity = (a * b).sum(axis=1)
+    upper = np.triu_indices(len(texts), k=1)
+    sim_a = (a @ a.T)[upper]
+    sim_b = (b @ b.T)[upper]
+    flips = int(((sim_a >= threshold) != (sim_b >= threshold)).sum())
+    
+    return {
+        "texts": len(texts),
+        "min_cosine": float(self_similarity.min()),
+        "mean_cosine": float(self_similarity.mean()),
+        "max_pair_similarity_delta": float(np.abs(sim_a - sim_b).max()) if len(sim_a) else 0.0,
+        "pairs": len(sim_a),
+        "pairs_near_threshold": int((np.abs(sim_a - threshold) < 0.05).sum()),
+        "decision_flips": flips
+    }
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+def cache_namespace(name: str = None) -> str:
+    """Embedding cache key prefix for a backend; vectors of different backends are not mixed"""
+    name = name or settings.embedding_backend
+    if name == "remote":
+        name = settings.embedding_server_backend
+    return settings.embedding_model if name == "torch" else f"{settings.embedding_model}:{name}"
+
+
+def get_embedding_backend(name: str = None) -> EmbeddingBackend:
+    """Build the backend selected by settings.embedding_backend ("torch", "onnx" or "remote")"""
+    name = name or settings.embedding_backend
+    if name == "remote":
+        return RemoteBackend(settings.embedding_model, settings.embedding_server_url)
+    if name == "torch":
+        return SentenceTransformerBackend(settings.embedding_model)
+    if name == "onnx":
+        return OnnxBackend(settings.embedding_model, settings.onnx_model_dir)
+    raise ValueError(f"Unknown embedding backend: {name}")
@@ -0,0 +1,121 @@
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.redis_client import redis_clients
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache for text embeddings, keyed by model name + hash of the
+    normalized text. Tier 1 is a bounded in-process LRU; tier 2 is Redis,
+    holding float16-packed vectors with a TTL so every worker shares hits.
+    """
+    
+    KEY_PREFIX = "empire:emb"
+    STATS_KEY = "empire:emb:stats"
+    
+    def __init__(self, max_items: int = None, ttl_seconds: int = None):
+        self.max_items = max_items or settings.embedding_cache_size
+        self.ttl_seconds = ttl_seconds or settings.embedding_cache_ttl
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0}
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).split())
+    
+    def key(self, model_name: str, text: str) -> str:
+        digest = hashlib.sha256(self.normalize(text).encode()).hexdigest()
+        return f"{self.KEY_PREFIX}:{model_name}:{digest}"
+    
+    def _remember(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+    
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached float32 vectors for texts, None where missing"""
+        keys = [self.key(model_name, text) for text in texts]
+        found: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: Dict[int, str] = {}
+        
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    found[i] = vector
+                else:
+                    missing[i] = key
+        memory_hits = len(texts) - len(missing)
+        
+        redis_hits = 0
+        if missing:
+            try:
+                values = redis_clients.get_sync().mget(list(missing.values()))
+                for (i, key), value in zip(missing.items(), values):
+                    if value is not None:
+                        vector = np.frombuffer(value, dtype='<f2').astype(np.float32)
+                        found[i] = vector
+                        self._remember(key, vector)
+                        redis_hits += 1
+            except Exception as e:
+                print(f"Embedding cache read error: {e}")
+        
+        self._count(memory_hits, redis_hits, len(missing) - redis_hits)
+        return found
+    
+    def put_many(self, model_name: str, texts: List[str], vectors) -> None:
+        """Store freshly computed vectors in both tiers"""
+        if not texts:
+            return
+        
+        try:
+            pipe = redis_clients.get_sync().pipeline(transaction=False)
+            for text, vector in zip(texts, vectors):
+                key = self.key(model_name, text)
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                pipe.set(key, vector.astype('<f2').tobytes(), ex=self.ttl_seconds)
+            pipe.execute()
+        except Exception as e:
+            print(f"Embedding cache write error: {e}")
+    
+    def _count(self, memory_hits: int, redis_hits: int, misses: int):
+        with self._lock:
+            self.stats["memory_hits"] += memory_hits
+            self.stats["redis_hits"] += redis_hits
+            self.stats["misses"] += misses
+        
+        # Cluster-wide counters for the dashboard
+        try:
+            pipe = redis_clients.get_sync().pipeline(transaction=False)
+            pipe.hincrby(self.STATS_KEY, "memory_hits", memory_hits)
+            pipe.hincrby(self.STATS_KEY, "redis_hits", redis_hits)
+            pipe.hincrby(self.STATS_KEY, "misses", misses)
+            pipe.execute()
+        except Exception:
+            pass
+    
+    async def cluster_stats(self) -> Dict[str, float]:
+        """Hit/miss counters summed over all workers"""
+        raw = await redis_clients.get_async().hgetall(self.STATS_KEY)
+        stats = {k.decode(): int(v) for k, v in raw.items()}
+        for name in ("memory_hits", "redis_hits", "misses"):
+            stats.setdefault(name, 0)
+        
+        total = stats["memory_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["redis_hits"]) / total, 4) if total else 0.0
+        return stats
+
+
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,175 @@
+from typing import Any, Dict, List
+
+import feedparser
+from lxml import etree
+
+
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+MEDIA_NS = "http://search.yahoo.com/mrss/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+
+ENTRY_TAGS = {"item", "entry"}
+
+
+def _local(tag) -> str:
+    if not isinstance(tag, str):
+        return ""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _ns(tag) -> str:
+    if isinstance(tag, str) and tag.startswith("{"):
+        return tag[1:].split("}", 1)[0]
+    return ""
+
+
+def _inner(element) -> str:
+    """Text of an element, or its serialized children for inline XHTML content"""
+    if len(element):
+        parts = [element.text or ""]
+        parts.extend(etree.tostring(child, encoding="unicode") for child in element)
+        return "".join(parts).strip()
+    return (element.text or "").strip()
+
+
+class FeedStreamParser:
+    """
+    Incremental RSS/Atom entry extractor on top of lxml's pull parser.
+    Bytes are fed as they arrive; parsing stops once max_items entries are
+    complete, and finished elements are cleared so memory stays flat.
+    Entries are plain dicts with link/title/content/image_url/published.
+    
+    The parser is strict: recover mode silently mangles the rest of a feed
+    after an undefined HTML entity such as &nbsp;, so any syntax error sets
+    failed and the caller falls back to feedparser.
+    """
+    
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self.entries: List[Dict[str, Any]] = []
+        self.failed = False
+        self._parser = etree.XMLPullParser(
+            events=("end",),
+            resolve_entities=False,
+            no_network=True
+        )
+    
+    @property
+    def done(self) -> bool:
+        return len(self.entries) >= self.max_items
+    
+    def feed(self, chunk: bytes) -> bool:
+        """Feed the next chunk; returns True once enough entries were parsed"""
+        if self.done or self.failed:
+            return self.done
+        
+        try:
+            self._parser.feed(chunk)
+            for _, element in self._parser.read_events():
+                if _local(element.tag) not in ENTRY_TAGS:
+                    continue
+                
+                self.entries.append(self._extract(element))
+                
+                # Drop the parsed subtree and already-processed siblings
+                element.clear()
+                parent = element.getparent()
+                while parent is not None and element.getprevious() is not None:
+                    del parent[0]
+                
+                if self.done:
+                    break
+        except etree.XMLSyntaxError:
+            self.failed = True
+        
+        return self.done
+    
+    def close(self):
+        """
+        Signal the end of the body. lxml may stop at an error without raising
+        until the document is closed, so this is where it surfaces.
+        """
+        if self.done or self.failed:
+            return
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:
+            self.failed = True
+    
+    def _extract(self, element) -> Dict[str, Any]:
+        entry = {"link": "", "title": "Untitled", "content": "", "image_url": None, "published": None}
+        encoded = summary = description = atom_content = None
+        media_content = media_thumbnail = enclosure_image = None
+        
+        for child in element:
+            name, ns = _local(child.tag), _ns(child.tag)
+            
+            if name == "title" and ns != MEDIA_NS:
+                entry["title"] = _inner(child) or entry["title"]
+            elif name == "link" and ns != MEDIA_NS:
+                # Atom links carry href; prefer rel="alternate"
+                href = child.get("href")
+                if href:
+                    if not entry["link"] or child.get("rel", "alternate") == "alternate":
+                        entry["link"] = href
+                elif child.text:
+                    entry["link"] = child.text.strip()
+            elif name == "encoded" and ns == CONTENT_NS:
+                encoded = _inner(child)
+            elif name == "content" and ns == MEDIA_NS:
+                media_content = media_content or child.get("url")
+            elif name == "thumbnail" and ns == MEDIA_NS:
+                media_thumbnail = media_thumbnail or child.get("url")
+            elif name == "content":
+                atom_content = _inner(child)
+            elif name == "summary":
+                summary = _inner(child)
+            elif name == "description" and ns != MEDIA_NS:
+                description = _inner(child)
+            elif name == "enclosure" and (child.get("type") or "").startswith("image/"):
+                enclosure_image = enclosure_image or child.get("url")
+            elif name in ("pubDate", "published") or (name == "date" and ns == DC_NS):
+                entry["published"] = entry["published"] or (child.text or "").strip() or None
+            elif name == "updated" and not entry["published"]:
+                entry["published"] = (child.text or "").strip() or None
+            elif name == "group" and ns == MEDIA_NS:
+                for media in child:
+                    if _local(media.tag) == "content":
+                        media_content = media_content or media.get("url")
+                    elif _local(media.tag) == "thumbnail":
+                        media_thumbnail = media_thumbnail or media.get("url")
+        
+        entry["content"] = encoded or atom_content or summary or description or ""
+        entry["image_url"] = media_content or media_thumbnail or enclosure_image
+        return entry
+
+
+def parse_entries_with_feedparser(body: bytes, max_items: int) -> List[Dict[str, Any]]:
+    """Fallback for feeds the pull parser cannot handle, same entry format"""
+    feed = feedparser.parse(body)
+    entries = []
+    
+    for entry in feed.entries[:max_items]:
+        content = ""
+        if hasattr(entry, 'content'):
+            content = entry.content[0].value
+        elif hasattr(entry, 'summary'):
+            content = entry.summary
+        elif hasattr(entry, 'description'):
+            content = entry.description
+        
+        image_url = None
+        if hasattr(entry, 'media_content'):
+            image_url = entry.media_content[0].get('url')
+        elif hasattr(entry, 'media_thumbnail'):
+            image_url = entry.media_thumbnail[0].get('url')
+        
+        entries.append({
+            "link": entry.get('link', ''),
+            "title": entry.get('title', 'Untitled'),
+            "content": content,
+            "image_url": image_url,
+            "published": entry.get('published', None)
+        })
+    
+    return entries
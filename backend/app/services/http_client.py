@@ -0,0 +1,79 @@
+import asyncio
+import weakref
+from typing import Dict
+
+import httpx
+
+from app.config import settings
+
+
+# Default timeouts per outbound service (individual calls may still override)
+SERVICE_TIMEOUTS: Dict[str, httpx.Timeout] = {
+    "default": httpx.Timeout(30.0, connect=10.0),
+    "feeds": httpx.Timeout(30.0, connect=10.0),
+    "openrouter": httpx.Timeout(120.0, connect=10.0),
+    "stock": httpx.Timeout(15.0, connect=5.0),
+    "media": httpx.Timeout(30.0, connect=10.0),
+    "wordpress": httpx.Timeout(60.0, connect=10.0),
+    "scraperapi": httpx.Timeout(60.0, connect=10.0),
+    "scrape": httpx.Timeout(20.0, connect=10.0),
+}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HTTPClientRegistry:
+    """
+    Process-wide registry of pooled httpx.AsyncClient instances.
+    Clients are keyed by service name and bound to the running event loop,
+    so each loop (FastAPI, Celery worker loop) gets its own keep-alive pool.
+    """
+    
+    def __init__(self):
+        self._clients = weakref.WeakKeyDictionary()  # loop -> {service: client}
+        self._http2 = settings.http2_enabled and _http2_available()
+        if settings.http2_enabled and not self._http2:
+            print("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+    
+    def _build_client(self, service: str) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=SERVICE_TIMEOUTS.get(service, SERVICE_TIMEOUTS["default"]),
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry
+            ),
+            http2=self._http2
+        )
+    
+    def get(self, service: str = "default") -> httpx.AsyncClient:
+        """Return the shared client for a service on the running event loop"""
+        loop = asyncio.get_running_loop()
+        clients = self._clients.setdefault(loop, {})
+        
+        client = clients.get(service)
+        if client is None or client.is_closed:
+            client = self._build_client(service)
+            clients[service] = client
+        
+        return client
+    
+    async def aclose(self):
+        """Close all clients bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        clients = self._clients.pop(loop, {})
+        
+        for client in clients.values():
+            try:
+                await client.aclose()
+            except Exception as e:
+                print(f"HTTP client close error: {e}")
+
+
+http_clients = HTTPClientRegistry()
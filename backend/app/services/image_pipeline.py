@@ -1,5 +1,4 @@
 import asyncio
-import httpx
 import random
 from typing import Optional, Tuple
 from PIL import Image
@@ -8,6 +7,8 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.config import settings
 from app.services.ai_processor import ai_processor
+from app.services.http_client import http_clients
+from app.services.rate_limiter import rate_limiter
 
 
 class ImagePipeline:
@@ -70,34 +71,36 @@ class ImagePipeline:
         # Try Pexels first
         if self.pexels_key:
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        "https://api.pexels.com/v1/search",
-                        headers={"Authorization": self.pexels_key},
-                        params={"query": query, "per_page": 5, "orientation": "landscape"},
-                        timeout=15
-                    )
-                    data = response.json()
-                    if data.get('photos'):
-                        photo = random.choice(data['photos'])
-                        return photo['src']['large']
+                await rate_limiter.acquire(["pexels"])
+                client = http_clients.get("stock")
+                response = await client.get(
+                    "https://api.pexels.com/v1/search",
+                    headers={"Authorization": self.pexels_key},
+                    params={"query": query, "per_page": 5, "orientation": "landscape"}
+                )
+                await rate_limiter.check_response(["pexels"], response)
+                data = response.json()
+                if data.get('photos'):
+                    photo = random.choice(data['photos'])
+                    return photo['src']['large']
             except Exception as e:
                 print(f"Pexels error: {e}")
         
         # Try Unsplash
         if self.unsplash_key:
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        "https://api.unsplash.com/search/photos",
-                        headers={"Authorization": f"Client-ID {self.unsplash_key}"},
-                        params={"query": query, "per_page": 5, "orientation": "landscape"},
-                        timeout=15
-                    )
-                    data = response.json()
-                    if data.get('results'):
-                        photo = random.choice(data['results'])
-                        return photo['urls']['regular']
+                await rate_limiter.acquire(["unsplash"])
+                client = http_clients.get("stock")
+                response = await client.get(
+                    "https://api.unsplash.com/search/photos",
+                    headers={"Authorization": f"Client-ID {self.unsplash_key}"},
+                    params={"query": query, "per_page": 5, "orientation": "landscape"}
+                )
+                await rate_limiter.check_response(["unsplash"], response)
+                data = response.json()
+                if data.get('results'):
+                    photo = random.choice(data['results'])
+                    return photo['urls']['regular']
             except Exception as e:
                 print(f"Unsplash error: {e}")
         
@@ -110,31 +113,34 @@ class ImagePipeline:
             return None
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://openrouter.ai/api/v1/images/generations",
-                    headers={
-                        "Authorization": f"Bearer {self.openrouter_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://empire.local",
-                        "X-Title": "AI Content Empire"
-                    },
-                    json={
-                        "model": "black-forest-labs/flux-schnell",
-                        "prompt": f"Professional photograph, high quality, {prompt}",
-                        "n": 1,
-                        "size": "1024x576"
-                    },
-                    timeout=60
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get("data") and len(data["data"]) > 0:
-                        return data["data"][0].get("url")
-                else:
-                    print(f"Flux generation error: {response.status_code} - {response.text}")
-                
+            buckets = ["openrouter", "black-forest-labs/flux-schnell"]
+            await rate_limiter.acquire(buckets)
+            client = http_clients.get("openrouter")
+            response = await client.post(
+                "https://openrouter.ai/api/v1/images/generations",
+                headers={
+                    "Authorization": f"Bearer {self.openrouter_key}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "https://empire.local",
+                    "X-Title": "AI Content Empire"
+                },
+                json={
+                    "model": "black-forest-labs/flux-schnell",
+                    "prompt": f"Professional photograph, high quality, {prompt}",
+                    "n": 1,
+                    "size": "1024x576"
+                },
+                timeout=60
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                if data.get("data") and len(data["data"]) > 0:
+                    return data["data"][0].get("url")
+            else:
+                await rate_limiter.check_response(buckets, response)
+                print(f"Flux generation error: {response.status_code} - {response.text}")
+            
         except Exception as e:
             print(f"Flux image generation error: {e}")
         
@@ -143,9 +149,9 @@ class ImagePipeline:
     async def download_image(self, url: str) -> Optional[bytes]:
         """Download image from URL"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=30)
-                return response.content
+            client = http_clients.get("media")
+            response = await client.get(url)
+            return response.content
         except:
             return None
 
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import time
+import unicodedata
+import zlib
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.services.redis_client import redis_clients
+
+
+class LLMResponseCache:
+    """
+    Redis cache of LLM completions keyed by model, normalized prompt hash and
+    sampling params. Entries expire after llm_cache_ttl; an index sorted by
+    insert time caps the cache at llm_cache_max_entries by evicting the oldest.
+    Values are zlib-compressed. Errors never break the LLM call path.
+    """
+    
+    KEY_PREFIX = "empire:llm"
+    INDEX_KEY = "empire:llm:index"
+    STATS_KEY = "empire:llm:stats"
+    
+    def __init__(self):
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+    
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", prompt).split())
+    
+    def key(self, model: str, prompt: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            {"model": model, "prompt": self.normalize(prompt), "params": params},
+            sort_keys=True
+        )
+        return f"{self.KEY_PREFIX}:{hashlib.sha256(payload.encode()).hexdigest()}"
+    
+    async def get(self, model: str, prompt: str, params: Dict[str, Any]) -> Optional[str]:
+        try:
+            redis = redis_clients.get_async()
+            value = await redis.get(self.key(model, prompt, params))
+            await self._count("hits" if value is not None else "misses")
+            return zlib.decompress(value).decode() if value is not None else None
+        except Exception as e:
+            print(f"LLM cache read error: {e}")
+            return None
+    
+    async def set(self, model: str, prompt: str, params: Dict[str, Any], response: str) -> None:
+        key = self.key(model, prompt, params)
+        now = time.time()
+        try:
+            redis = redis_clients.get_async()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, zlib.compress(response.encode()), ex=settings.llm_cache_ttl)
+                pipe.zadd(self.INDEX_KEY, {key: now})
+                pipe.zremrangebyscore(self.INDEX_KEY, "-inf", now - settings.llm_cache_ttl)
+                pipe.zcard(self.INDEX_KEY)
+                size = (await pipe.execute())[-1]
+            
+            # Size cap: drop the oldest entries
+            overflow = size - settings.llm_cache_max_entries
+            if overflow > 0:
+                evicted = await redis.zpopmin(self.INDEX_KEY, overflow)
+                if evicted:
+                    await redis.delete(*[member for member, _ in evicted])
+            await self._count("stores")
+        except Exception as e:
+            print(f"LLM cache write error: {e}")
+    
+    async def _count(self, name: str):
+        self.stats[name] += 1
+        try:
+            await redis_clients.get_async().hincrby(self.STATS_KEY, name, 1)
+        except Exception:
+            pass
+    
+    async def cluster_stats(self) -> Dict[str, float]:
+        """Counters summed over all workers, plus the current entry count"""
+        redis = redis_clients.get_async()
+        raw = await redis.hgetall(self.STATS_KEY)
+        stats = {k.decode(): int(v) for k, v in raw.items()}
+        for name in ("hits", "misses", "stores"):
+            stats.setdefault(name, 0)
+        
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["entries"] = await redis.zcard(self.INDEX_KEY)
+        return stats
+
+
+llm_cache = LLMResponseCache()
@@ -0,0 +1,254 @@
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class LocalVectorIndex:
+    """
+    Embedded replacement for the Chroma collection used by VectorStore.
+    Vectors live in a memory-mapped .npy matrix (L2-normalized, so cosine is a
+    dot product) with ids/metadata in a JSON sidecar; queries are brute-force
+    over the rows passing the metadata filter, which is fast for windowed dedup.
+    Writes take an exclusive file lock and replace both files atomically, and
+    readers reload whenever another process has written, so prefork workers
+    can share one directory.
+    
+    Implements the subset of the Chroma Collection API that VectorStore uses
+    (add/query/get/update/delete with where filters).
+    """
+    
+    VECTORS_FILE = "vectors.npy"
+    INDEX_FILE = "index.json"
+    LOCK_FILE = ".lock"
+    
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        self._stamp = None
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._ids: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._columns: Dict[str, np.ndarray] = {}
+        self._dirty = False
+    
+    # --- Persistence ---
+    
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+    
+    def _current_stamp(self):
+        try:
+            stat = os.stat(self._file(self.INDEX_FILE))
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+    
+    def _refresh(self):
+        """Reload if another process (or thread) wrote since we last loaded"""
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return
+        
+        if stamp is None:
+            self._vectors = np.empty((0, 0), dtype=np.float32)
+            self._ids, self._metadatas = [], []
+        else:
+            with open(self._file(self.INDEX_FILE)) as f:
+                index = json.load(f)
+            self._ids, self._metadatas = index["ids"], index["metadatas"]
+            self._vectors = np.load(self._file(self.VECTORS_FILE), mmap_mode="r") if self._ids else np.empty((0, 0), dtype=np.float32)
+        self._columns = {}
+        self._stamp = stamp
+    
+    @contextmanager
+    def _writing(self):
+        with self._lock, open(self._file(self.LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                self._dirty = False
+                yield
+                if self._dirty:
+                    self._save()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    
+    def _save(self):
+        vectors_tmp = self._file(self.VECTORS_FILE + ".tmp")
+        index_tmp = self._file(self.INDEX_FILE + ".tmp")
+        
+        with open(vectors_tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(self._vectors, dtype=np.float32))
+        with open(index_tmp, "w") as f:
+            json.dump({"ids": self._ids, "metadatas": self._metadatas}, f)
+        
+        # Vectors first: readers key off the index file
+        os.replace(vectors_tmp, self._file(self.VECTORS_FILE))
+        os.replace(index_tmp, self._file(self.INDEX_FILE))
+        
+        self._vectors = np.load(self._file(self.VECTORS_FILE), mmap_mode="r") if self._ids else np.empty((0, 0), dtype=np.float32)
+        self._columns = {}
+        self._stamp = self._current_stamp()
+    
+    # --- Metadata filters ---
+    
+    def _column(self, key: str) -> np.ndarray:
+        column = self._columns.get(key)
+        if column is None:
+            column = np.array([(m or {}).get(key) for m in self._metadatas], dtype=object)
+            self._columns[key] = column
+        return column
+    
+    def _compare(self, column: np.ndarray, op: str, value) -> np.ndarray:
+        present = np.array([v is not None for v in column], dtype=bool)
+        if op == "$eq":
+            return column == value
+        if op == "$ne":
+            return column != value
+        if op == "$in":
+            return _member(column, value)
+        if op == "$nin":
+            return ~_member(column, value)
+        
+        values = np.array([v if v is not None else np.nan for v in column], dtype=float)
+        with np.errstate(invalid="ignore"):
+            if op == "$gt":
+                result = values > value
+            elif op == "$gte":
+                result = values >= value
+            elif op == "$lt":
+                result = values < value
+            elif op == "$lte":
+                result = values <= value
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        return result & present
+    
+    def _mask(self, where: Optional[dict]) -> np.ndarray:
+        if not where:
+            return np.ones(len(self._ids), dtype=bool)
+        
+        mask = np.ones(len(self._ids), dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._mask(clause)
+            elif key == "$or":
+                any_mask = np.zeros(len(self._ids), dtype=bool)
+                for clause in condition:
+                    any_mask |= self._mask(clause)
+                mask &= any_mask
+            elif isinstance(condition, dict):
+                for op, value in condition.items():
+                    mask &= self._compare(self._column(key), op, value)
+            else:
+                mask &= self._column(key) == condition
+        return mask
+    
+    # --- Collection API ---
+    
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+    
+    def add(self, ids: List[str], embeddings, metadatas: List[dict] = None, documents: List[str] = None):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        metadatas = metadatas or [{} for _ in ids]
+        
+        with self._writing():
+            # Same semantics as an upsert: an existing id is replaced
+            keep = ~_member(self._ids, ids)
+            current = np.asarray(self._vectors)[keep] if len(self._ids) else np.empty((0, vectors.shape[1]), dtype=np.float32)
+            
+            self._ids = [i for i, k in zip(self._ids, keep) if k] + list(ids)
+            self._metadatas = [m for m, k in zip(self._metadatas, keep) if k] + [dict(m or {}) for m in metadatas]
+            self._vectors = np.vstack([current, vectors]) if len(current) else vectors
+            self._dirty = True
+    
+    upsert = add
+    
+    def query(self, query_embeddings, n_results: int = 1, where: Optional[dict] = None, include=None):
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries = queries / np.clip(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12, None)
+        
+        with self._lock:
+            self._refresh()
+            rows = np.flatnonzero(self._mask(where)) if self._ids else np.empty(0, dtype=int)
+            ids, distances, metadatas = [], [], []
+            
+            if len(rows) == 0:
+                empty = [[] for _ in range(len(queries))]
+                return {"ids": empty, "distances": [[] for _ in queries], "metadatas": [[] for _ in queries]}
+            
+            similarity = queries @ np.asarray(self._vectors[rows]).T
+            k = min(n_results, len(rows))
+            for scores in similarity:
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top])]
+                ids.append([self._ids[rows[j]] for j in top])
+                distances.append([float(1 - scores[j]) for j in top])
+                metadatas.append([self._metadatas[rows[j]] for j in top])
+        
+        return {"ids": ids, "distances": distances, "metadatas": metadatas}
+    
+    def get(self, ids: List[str] = None, where: Optional[dict] = None, limit: int = None, offset: int = None, include=None):
+        with self._lock:
+            self._refresh()
+            mask = self._mask(where)
+            if ids is not None:
+                mask &= _member(self._ids, ids)
+            rows = np.flatnonzero(mask)[offset or 0:]
+            if limit is not None:
+                rows = rows[:limit]
+            return {
+                "ids": [self._ids[j] for j in rows],
+                "metadatas": [self._metadatas[j] for j in rows]
+            }
+    
+    def update(self, ids: List[str], metadatas: List[dict] = None, embeddings=None):
+        with self._writing():
+            positions = {article_id: j for j, article_id in enumerate(self._ids)}
+            vectors = np.array(self._vectors) if embeddings is not None else None
+            
+            for n, article_id in enumerate(ids):
+                j = positions.get(article_id)
+                if j is None:
+                    continue
+                if metadatas is not None:
+                    self._metadatas[j] = {**self._metadatas[j], **metadatas[n]}
+                if vectors is not None:
+                    vector = np.asarray(embeddings[n], dtype=np.float32)
+                    vectors[j] = vector / max(np.linalg.norm(vector), 1e-12)
+            
+            if vectors is not None:
+                self._vectors = vectors
+            self._dirty = True
+    
+    def delete(self, ids: List[str] = None, where: Optional[dict] = None):
+        with self._writing():
+            if not self._ids:
+                return
+            remove = self._mask(where) if where else np.zeros(len(self._ids), dtype=bool)
+            if ids is not None:
+                remove |= _member(self._ids, ids)
+            if not remove.any():
+                return
+            
+            keep = ~remove
+            self._vectors = np.asarray(self._vectors)[keep]
+            self._ids = [i for i, k in zip(self._ids, keep) if k]
+            self._metadatas = [m for m, k in zip(self._metadatas, keep) if k]
+            self._dirty = True
+
+
+def _member(values, candidates) -> np.ndarray:
+    candidates = set(candidates)
+    return np.array([v in candidates for v in values], dtype=bool)
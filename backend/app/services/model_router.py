@@ -0,0 +1,226 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.services.redis_client import redis_clients
+
+
+class ModelRouter:
+    """
+    Routes LLM calls across an ordered list of models using health shared by
+    all workers in Redis. Each model keeps its last router_window outcomes
+    (success flag + latency); when the failure rate over them reaches
+    router_failure_threshold the circuit opens for router_open_seconds, then
+    half-opens and lets a single probe call through, closing again on success.
+    
+    A call that is still running after the primary's p95 latency is hedged to
+    the next model and the first successful answer wins. A call cancelled
+    because its hedge won is kept as a lower-bound latency sample, so a slow
+    model's p95 keeps rising until it stops being hedged every time; until
+    enough samples exist the delay is derived from the call's max_tokens.
+    Redis errors never block a call: the router then behaves like a plain
+    primary -> fallback chain.
+    """
+    
+    KEY_PREFIX = "empire:router"
+    
+    # Outcome codes stored with each latency sample
+    FAILED, SUCCEEDED, CANCELLED = 0, 1, 2
+    
+    def _key(self, model: str, name: str) -> str:
+        return f"{self.KEY_PREFIX}:{model}:{name}"
+    
+    # --- Health ---
+    
+    async def record(self, model: str, outcome: int, latency: float) -> None:
+        """Store one request outcome and trip or close the circuit accordingly"""
+        try:
+            redis = redis_clients.get_async()
+            outcomes_key = self._key(model, "outcomes")
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.lpush(outcomes_key, f"{outcome}:{int(latency * 1000)}")
+                pipe.ltrim(outcomes_key, 0, settings.router_window - 1)
+                pipe.expire(outcomes_key, 24 * 3600)
+                pipe.exists(self._key(model, "half_open"))
+                pipe.lrange(outcomes_key, 0, -1)
+                *_, half_open, raw = await pipe.execute()
+            
+            if outcome == self.CANCELLED:
+                # Says nothing about health; a cancelled probe just lets its slot expire
+                return
+            
+            if half_open:
+                if outcome == self.SUCCEEDED:
+                    # Probe succeeded: close and start from a clean history
+                    await redis.delete(self._key(model, "half_open"), self._key(model, "probe"), outcomes_key)
+                    print(f"Model router: circuit closed for {model}")
+                else:
+                    await self._open(model)
+                return
+            
+            outcomes = [code for code, _ in self._parse(raw) if code != self.CANCELLED]
+            failures = outcomes.count(self.FAILED)
+            if len(outcomes) >= settings.router_min_calls and failures / len(outcomes) >= settings.router_failure_threshold:
+                await self._open(model)
+        except Exception as e:
+            print(f"Model router record error: {e}")
+    
+    async def _open(self, model: str):
+        redis = redis_clients.get_async()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(model, "open"), "1", ex=settings.router_open_seconds)
+            pipe.set(self._key(model, "half_open"), "1")
+            pipe.delete(self._key(model, "probe"))
+            await pipe.execute()
+        print(f"Model router: circuit opened for {model} ({settings.router_open_seconds}s)")
+    
+    async def allow(self, model: str) -> bool:
+        """Closed: yes. Open: no. Half-open: only the one caller that wins the probe slot."""
+        try:
+            redis = redis_clients.get_async()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.exists(self._key(model, "open"))
+                pipe.exists(self._key(model, "half_open"))
+                is_open, half_open = await pipe.execute()
+            if is_open:
+                return False
+            if half_open:
+                return bool(await redis.set(self._key(model, "probe"), "1", nx=True, ex=settings.router_probe_timeout))
+            return True
+        except Exception as e:
+            print(f"Model router state error: {e}")
+            return True
+    
+    @staticmethod
+    def _parse(raw) -> List[tuple]:
+        outcomes = []
+        for entry in raw:
+            code, latency = (entry.decode() if isinstance(entry, bytes) else entry).split(":")
+            outcomes.append((int(code), int(latency) / 1000))
+        return outcomes
+    
+    @staticmethod
+    def _p95(latencies: List[float]) -> Optional[float]:
+        if not latencies:
+            return None
+        latencies = sorted(latencies)
+        return latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+    
+    def _latencies(self, outcomes) -> List[float]:
+        """Latencies of successful calls plus the lower bounds of cancelled ones"""
+        return [latency for code, latency in outcomes if code != self.FAILED]
+    
+    async def hedge_delay(self, model: str, max_tokens: int) -> float:
+        """Seconds to wait on a model before hedging: its p95, or an estimate from max_tokens"""
+        estimate = settings.router_hedge_min_delay + max_tokens / settings.router_hedge_tokens_per_second
+        try:
+            raw = await redis_clients.get_async().lrange(self._key(model, "outcomes"), 0, -1)
+            outcomes = self._parse(raw)
+            latencies = self._latencies(outcomes)
+            if len(latencies) >= settings.router_min_calls:
+                delay = max(settings.router_hedge_min_delay, self._p95(latencies))
+                cancelled = sum(1 for code, _ in outcomes if code == self.CANCELLED)
+                if cancelled > len(latencies) * 0.1:
+                    # Too many calls cut short to know the real p95: wait long
+                    # enough for the model to finish and report true latencies
+                    delay = max(delay, estimate)
+                return delay
+        except Exception as e:
+            print(f"Model router state error: {e}")
+        return estimate
+    
+    @asynccontextmanager
+    async def observe(self, model: str):
+        """Time one request to a model and record its outcome"""
+        started = time.perf_counter()
+        try:
+            yield
+        except asyncio.CancelledError:
+            await self.record(model, self.CANCELLED, time.perf_counter() - started)
+            raise
+        except Exception:
+            await self.record(model, self.FAILED, time.perf_counter() - started)
+            raise
+        await self.record(model, self.SUCCEEDED, time.perf_counter() - started)
+    
+    # --- Routing ---
+    
+    async def call(self, models: List[str], attempt: Callable[[str, bool], Awaitable[str]], max_tokens: int = 4000) -> str:
+        """
+        Run attempt(model, last) on the first model whose circuit allows it,
+        hedging to the next one when it is slow and failing over when it
+        errors. last is True for the final candidate, which may retry.
+        """
+        candidates = [model for model in models if await self.allow(model)]
+        if not candidates:
+            # Every circuit is open: try the chain anyway rather than drop the work
+            candidates = list(models)
+        
+        remaining = list(candidates)
+        running: Dict[asyncio.Task, str] = {}
+        errors = []
+        
+        def launch():
+            model = remaining.pop(0)
+            running[asyncio.create_task(attempt(model, not remaining))] = model
+        
+        launch()
+        try:
+            while running:
+                timeout = None
+                if remaining and settings.router_hedge_enabled:
+                    timeout = await self.hedge_delay(list(running.values())[0], max_tokens)
+                
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    print(f"Model router: {list(running.values())[0]} slow, hedging to {remaining[0]}")
+                    launch()
+                    continue
+                
+                for task in done:
+                    model = running.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+                    print(f"Model router: {model} failed: {task.exception()}")
+                
+                if not running and remaining:
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+            # Let the losers record their cancelled latency before returning
+            await asyncio.gather(*running, return_exceptions=True)
+        
+        raise errors[-1]
+    
+    async def cluster_stats(self) -> Dict[str, dict]:
+        """Circuit state, success rate and p95 latency per model seen by any worker"""
+        redis = redis_clients.get_async()
+        stats = {}
+        async for key in redis.scan_iter(match=f"{self.KEY_PREFIX}:*:outcomes"):
+            model = key.decode()[len(self.KEY_PREFIX) + 1:-len(":outcomes")]
+            outcomes = self._parse(await redis.lrange(key, 0, -1))
+            completed = [code for code, _ in outcomes if code != self.CANCELLED]
+            
+            if await redis.exists(self._key(model, "open")):
+                state = "open"
+            elif await redis.exists(self._key(model, "half_open")):
+                state = "half_open"
+            else:
+                state = "closed"
+            
+            p95 = self._p95(self._latencies(outcomes))
+            stats[model] = {
+                "state": state,
+                "calls": len(outcomes),
+                "cancelled": len(outcomes) - len(completed),
+                "success_rate": round(completed.count(self.SUCCEEDED) / len(completed), 4) if completed else 1.0,
+                "p95_latency_s": round(p95, 2) if p95 is not None else None
+            }
+        return stats
+
+
+model_router = ModelRouter()
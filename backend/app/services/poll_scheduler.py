@@ -0,0 +1,58 @@
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.config import settings
+from app.models import Source, Site, VelocityMode
+
+
+class PollScheduler:
+    """
+    Per-source adaptive polling.
+    Each source starts at its configured poll_interval (at least 24h for
+    evergreen sites), backs off while polls return nothing new and tightens
+    again when they do, within [base * min factor, base * max factor].
+    """
+    
+    def base_interval(self, source: Source, site: Optional[Site]) -> int:
+        """Configured interval in minutes"""
+        interval = source.poll_interval or 10
+        if site is not None and site.velocity_mode == VelocityMode.EVERGREEN:
+            interval = max(interval, 24 * 60)
+        return max(interval, settings.poll_min_interval_minutes)
+    
+    def bounds(self, source: Source, site: Optional[Site]):
+        base = self.base_interval(source, site)
+        lower = max(int(base * settings.poll_min_interval_factor), settings.poll_min_interval_minutes)
+        upper = min(int(base * settings.poll_max_backoff_factor), settings.poll_max_interval_minutes)
+        return min(lower, base), max(upper, base)
+    
+    def current_interval(self, source: Source, site: Optional[Site]) -> int:
+        return source.current_poll_interval or self.base_interval(source, site)
+    
+    def next_interval(self, source: Source, site: Optional[Site], articles_created: int) -> int:
+        """Adapt the interval to the yield of the poll that just finished"""
+        lower, upper = self.bounds(source, site)
+        current = self.current_interval(source, site)
+        
+        if articles_created > 0:
+            interval = current * settings.poll_tighten_factor
+        else:
+            interval = current * settings.poll_backoff_factor
+        
+        return int(min(max(interval, lower), upper))
+    
+    def next_poll_at(self, interval_minutes: int, now: datetime = None) -> datetime:
+        """Due time with +/-10% jitter so sources drift apart instead of firing together"""
+        now = now or datetime.utcnow()
+        jitter = random.uniform(0.9, 1.1)
+        return now + timedelta(minutes=interval_minutes * jitter)
+    
+    def record_poll(self, source: Source, site: Optional[Site], articles_created: int, now: datetime = None):
+        """Update the source's adaptive interval and next due time after a poll"""
+        interval = self.next_interval(source, site, articles_created)
+        source.current_poll_interval = interval
+        source.next_poll_at = self.next_poll_at(interval, now)
+
+
+poll_scheduler = PollScheduler()
@@ -0,0 +1,173 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.services.redis_client import redis_clients
+
+
+# Take one token from every bucket, or none. Returns "0" on success, else the
+# seconds to wait (the longest refill or Retry-After block among the buckets).
+# Buckets with rate 0 are not token-limited but still honor blocks.
+ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local wait = 0
+local tokens = {}
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[2 * i])
+    local burst = tonumber(ARGV[2 * i + 1])
+    local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'ts', 'blocked_until')
+    local blocked = tonumber(bucket[3]) or 0
+    if blocked > now then
+        wait = math.max(wait, blocked - now)
+    end
+    if rate > 0 then
+        local ts = tonumber(bucket[2]) or now
+        tokens[i] = math.min(burst, (tonumber(bucket[1]) or burst) + math.max(0, now - ts) * rate)
+        if tokens[i] < 1 then
+            wait = math.max(wait, (1 - tokens[i]) / rate)
+        end
+    end
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i = 1, #KEYS do
+    local rate = tonumber(ARGV[2 * i])
+    if rate > 0 then
+        local burst = tonumber(ARGV[2 * i + 1])
+        redis.call('HSET', KEYS[i], 'tokens', tokens[i] - 1, 'ts', now)
+        redis.call('EXPIRE', KEYS[i], math.ceil(burst / rate) + 3600)
+    end
+end
+return '0'
+"""
+
+# Block a bucket until now + seconds, never shortening an existing block
+BLOCK_SCRIPT = """
+local until_ts = tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+if until_ts > current then
+    redis.call('HSET', KEYS[1], 'blocked_until', until_ts)
+end
+redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2])) + 3600)
+return 1
+"""
+
+
+class RateLimiter:
+    """
+    Token buckets in Redis shared by every worker, one per provider
+    (openrouter, pexels, unsplash) and optionally per OpenRouter model, as
+    configured in settings.rate_limits. A call acquires a token from all of
+    its buckets atomically, sleeping until they refill; a 429/503 with
+    Retry-After blocks the most specific bucket (the model) for everyone
+    until that time instead of letting each worker's retries hit the
+    provider again. The provider bucket is only blocked when the response
+    says the account-wide limit is spent, so one model's limit does not stall
+    the fallback model or the other APIs of the same provider.
+    Redis errors never block a call.
+    """
+    
+    KEY_PREFIX = "empire:ratelimit"
+    
+    def __init__(self):
+        self._spec = None
+        self._limits: Dict[str, Tuple[float, float]] = {}
+    
+    @property
+    def limits(self) -> Dict[str, Tuple[float, float]]:
+        """settings.rate_limits parsed as {name: (tokens per second, burst)}"""
+        if self._spec != settings.rate_limits:
+            limits = {}
+            for item in settings.rate_limits.split(","):
+                if not item.strip():
+                    continue
+                name, value = item.strip().rsplit("=", 1)
+                rate, _, burst = value.partition("/")
+                limits[name.strip()] = (float(rate), float(burst or 1))
+            self._limits, self._spec = limits, settings.rate_limits
+        return self._limits
+    
+    def _key(self, name: str) -> str:
+        return f"{self.KEY_PREFIX}:{name}"
+    
+    async def acquire(self, names: List[str]) -> None:
+        """Wait for a token in every named bucket; raises after rate_limit_max_wait seconds"""
+        keys, args = [], []
+        for name in names:
+            rate, burst = self.limits.get(name, (0.0, 0.0))
+            keys.append(self._key(name))
+            args += [rate, burst]
+        
+        deadline = time.monotonic() + settings.rate_limit_max_wait
+        while True:
+            try:
+                script = redis_clients.get_async().register_script(ACQUIRE_SCRIPT)
+                wait = float(await script(keys=keys, args=[time.time()] + args))
+            except Exception as e:
+                print(f"Rate limiter error: {e}")
+                return
+            
+            if wait <= 0:
+                return
+            if time.monotonic() + wait > deadline:
+                raise Exception(f"Rate limit: no capacity for {', '.join(names)} within {settings.rate_limit_max_wait}s")
+            # Jitter so waiting workers do not all wake on the same refill
+            await asyncio.sleep(wait + random.uniform(0, 0.1))
+    
+    async def block(self, names: List[str], seconds: float) -> None:
+        """Stop every worker from using the named buckets for the given seconds"""
+        try:
+            script = redis_clients.get_async().register_script(BLOCK_SCRIPT)
+            for name in names:
+                await script(keys=[self._key(name)], args=[time.time() + seconds, seconds])
+            print(f"Rate limiter: {', '.join(names)} blocked for {seconds:.1f}s")
+        except Exception as e:
+            print(f"Rate limiter error: {e}")
+    
+    async def check_response(self, names: List[str], response: httpx.Response) -> None:
+        """
+        Block buckets when the provider says it is over its limit. names go
+        from the provider to the most specific bucket, as passed to acquire().
+        """
+        if response.status_code == 429:
+            seconds = retry_after(response) or settings.rate_limit_default_backoff
+        elif response.status_code == 503:
+            seconds = retry_after(response)
+        else:
+            return
+        if not seconds:
+            return
+        
+        blocked = [names[-1]]
+        if len(names) > 1 and _account_wide(response):
+            blocked.insert(0, names[0])
+        await self.block(blocked, seconds)
+
+
+def _account_wide(response: httpx.Response) -> bool:
+    """Whether the limit hit is the whole account's (its remaining quota is zero) rather than one model's"""
+    return response.headers.get("X-RateLimit-Remaining", "").strip() == "0"
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """Retry-After header in seconds (delta-seconds or HTTP date), capped at 1 hour"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), 3600.0)
+
+
+rate_limiter = RateLimiter()
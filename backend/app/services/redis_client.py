@@ -0,0 +1,44 @@
+import asyncio
+import weakref
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+
+class RedisClients:
+    """
+    Shared Redis clients for application state (not the Celery broker).
+    Async clients are bound to the running event loop; the sync client is
+    used from sync code paths such as the vector store.
+    """
+    
+    def __init__(self):
+        self._async_clients = weakref.WeakKeyDictionary()  # loop -> client
+        self._sync_client = None
+    
+    def get_async(self) -> aioredis.Redis:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = aioredis.from_url(settings.redis_url, decode_responses=False)
+            self._async_clients[loop] = client
+        return client
+    
+    def get_sync(self) -> redis.Redis:
+        if self._sync_client is None:
+            self._sync_client = redis.Redis.from_url(settings.redis_url, decode_responses=False)
+        return self._sync_client
+    
+    async def aclose(self):
+        """Close the async client bound to the running event loop"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            try:
+                await client.aclose()
+            except Exception as e:
+                print(f"Redis client close error: {e}")
+
+
+redis_clients = RedisClients()
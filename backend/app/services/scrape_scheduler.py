@@ -0,0 +1,70 @@
+import asyncio
+from collections import defaultdict
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional, TypeVar
+from urllib.parse import urlparse
+
+from app.config import settings
+
+
+T = TypeVar("T")
+
+
+class ScrapeScheduler:
+    """
+    Fetch many URLs concurrently under a global cap, a per-domain cap and a
+    minimum spacing between request starts on the same domain.
+    Results are yielded as soon as each fetch completes.
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int = None,
+        per_domain_concurrency: int = None,
+        domain_delay: float = None
+    ):
+        self.max_concurrency = max_concurrency or settings.scrape_max_concurrency
+        self.per_domain_concurrency = per_domain_concurrency or settings.scrape_per_domain_concurrency
+        self.domain_delay = settings.scrape_domain_delay if domain_delay is None else domain_delay
+    
+    async def run(
+        self,
+        urls: Iterable[str],
+        fetch: Callable[[str], Awaitable[Optional[T]]]
+    ) -> AsyncIterator[T]:
+        loop = asyncio.get_running_loop()
+        global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        domain_semaphores = defaultdict(lambda: asyncio.Semaphore(self.per_domain_concurrency))
+        domain_locks = defaultdict(asyncio.Lock)
+        last_start = {}
+        
+        async def worker(url: str) -> Optional[T]:
+            domain = urlparse(url).netloc.lower()
+            
+            async with domain_semaphores[domain]:
+                # Politeness spacing, enforced before taking a global slot
+                async with domain_locks[domain]:
+                    wait = last_start.get(domain, 0) + self.domain_delay - loop.time()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    last_start[domain] = loop.time()
+                
+                async with global_semaphore:
+                    try:
+                        return await fetch(url)
+                    except Exception as e:
+                        print(f"Scheduled fetch error for {url}: {e}")
+                        return None
+        
+        tasks = [asyncio.create_task(worker(url)) for url in urls]
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result is not None:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+scrape_scheduler = ScrapeScheduler()
@@ -0,0 +1,104 @@
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.models import Article
+from app.models.base import async_session
+from app.services.redis_client import redis_clients
+from app.utils.urls import url_hash
+
+
+class SeenURLIndex:
+    """
+    Redis-backed index of article URLs we have already ingested.
+    Stored as one sorted set of normalized-URL hashes scored by the time
+    they were seen; entries older than the retention window are trimmed.
+    """
+    
+    KEY = "empire:seen_urls"
+    SEEDED_KEY = "empire:seen_urls:seeded"
+    SEEDING_KEY = "empire:seen_urls:seeding"
+    
+    def __init__(self, ttl_days: int = None):
+        self.ttl_days = ttl_days or settings.seen_url_ttl_days
+    
+    @property
+    def ttl_seconds(self) -> int:
+        return self.ttl_days * 24 * 3600
+    
+    async def ensure_seeded(self) -> None:
+        """
+        Load recent article URLs from Postgres once (again if Redis was flushed).
+        Runs in its own session so a failed seed never aborts the caller's
+        transaction; the seeded marker is only set once every URL is loaded,
+        so a failed seed is retried by the next poll.
+        """
+        try:
+            redis = redis_clients.get_async()
+            if await redis.exists(self.SEEDED_KEY):
+                return
+            # One worker seeds at a time; the lock expires if it dies mid-seed
+            if not await redis.set(self.SEEDING_KEY, "1", nx=True, ex=300):
+                return
+            
+            try:
+                cutoff = datetime.utcnow() - timedelta(days=self.ttl_days)
+                async with async_session() as db:
+                    result = await db.execute(
+                        select(Article.original_url, Article.created_at)
+                        .where(Article.created_at >= cutoff)
+                    )
+                    rows = result.all()
+                
+                mapping = {}
+                for url, created_at in rows:
+                    mapping[url_hash(url)] = created_at.timestamp() if created_at else time.time()
+                    if len(mapping) >= 5000:
+                        await redis.zadd(self.KEY, mapping)
+                        mapping = {}
+                if mapping:
+                    await redis.zadd(self.KEY, mapping)
+                
+                await redis.set(self.SEEDED_KEY, "1", ex=self.ttl_seconds)
+            finally:
+                await redis.delete(self.SEEDING_KEY)
+        
+        except Exception as e:
+            print(f"Seen URL index seed error: {e}")
+    
+    async def filter_unseen(self, urls: Iterable[str]) -> List[str]:
+        """Return the URLs not in the index, preserving order. Fails open if Redis is down"""
+        urls = list(urls)
+        if not urls:
+            return urls
+        
+        try:
+            redis = redis_clients.get_async()
+            scores = await redis.zmscore(self.KEY, [url_hash(url) for url in urls])
+        except Exception as e:
+            print(f"Seen URL index lookup error: {e}")
+            return urls
+        
+        cutoff = time.time() - self.ttl_seconds
+        return [url for url, score in zip(urls, scores) if score is None or score < cutoff]
+    
+    async def add(self, urls: Iterable[str]) -> None:
+        """Mark URLs as seen and trim expired entries"""
+        mapping = {url_hash(url): time.time() for url in urls if url}
+        if not mapping:
+            return
+        
+        try:
+            redis = redis_clients.get_async()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.zadd(self.KEY, mapping)
+                pipe.zremrangebyscore(self.KEY, "-inf", time.time() - self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Seen URL index update error: {e}")
+
+
+seen_url_index = SeenURLIndex()
@@ -0,0 +1,218 @@
+import json
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.redis_client import redis_clients
+
+
+# Move every live key to its flushing generation in one step, unless a
+# failed generation of that key is still waiting to be retried
+ROTATE_SCRIPT = """
+for i = 1, #KEYS, 2 do
+    if redis.call('EXISTS', KEYS[i + 1]) == 0 and redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('RENAME', KEYS[i], KEYS[i + 1])
+    end
+end
+return 1
+"""
+
+
+def _pack(embedding, metadata: dict, document: str) -> bytes:
+    """One hash field per vector: header length, JSON header, float32 vector"""
+    header = json.dumps({"metadata": metadata, "document": document}).encode()
+    return struct.pack("<I", len(header)) + header + np.asarray(embedding, dtype='<f4').tobytes()
+
+
+def _unpack(data: bytes) -> Tuple[np.ndarray, dict]:
+    (size,) = struct.unpack_from("<I", data)
+    header = json.loads(data[4:4 + size])
+    return np.frombuffer(data[4 + size:], dtype='<f4'), header
+
+
+class VectorWriteBuffer:
+    """
+    Redis-backed buffer of vector store writes shared by all workers.
+    Adds land in a hash (vector and metadata packed in one field) and
+    deletes in a set; a flush atomically renames both to a "flushing"
+    generation, upserts/deletes them in bulk and drops the generation, so
+    new writes never race the flush and a failed flush is retried as is.
+    Entries the store rejects on their own are moved to a dead-letter hash
+    instead of failing every later flush. Until flushed, pending vectors are
+    served to dedup queries through pending().
+    """
+    
+    ENTRIES_KEY = "empire:vectors:pending_entries"
+    DELETES_KEY = "empire:vectors:pending_deletes"
+    DEAD_LETTER_KEY = "empire:vectors:dead_letter"
+    FLUSHING_SUFFIX = ":flushing"
+    LOCK_KEY = "empire:vectors:flush_lock"
+    ATTEMPTS_KEY = "empire:vectors:flush_attempts"
+    MAX_FLUSH_ATTEMPTS = 5
+    
+    # Layout before vectors and metadata shared a field; drained on flush
+    LEGACY_VECTORS_KEY = "empire:vectors:pending"
+    LEGACY_META_KEY = "empire:vectors:pending_meta"
+    
+    @property
+    def redis(self):
+        return redis_clients.get_sync()
+    
+    def add(self, article_id: str, embedding, metadata: dict, document: str) -> int:
+        """Queue an upsert; returns the number of pending adds"""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(self.ENTRIES_KEY, article_id, _pack(embedding, metadata, document))
+        pipe.srem(self.DELETES_KEY, article_id)
+        pipe.hlen(self.ENTRIES_KEY)
+        return pipe.execute()[-1]
+    
+    def delete(self, article_ids: List[str]) -> None:
+        """Queue deletes, dropping any pending add of the same ids"""
+        if not article_ids:
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hdel(self.ENTRIES_KEY, *article_ids)
+        pipe.sadd(self.DELETES_KEY, *article_ids)
+        pipe.execute()
+    
+    def size(self) -> int:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hlen(self.ENTRIES_KEY)
+        pipe.scard(self.DELETES_KEY)
+        return sum(pipe.execute())
+    
+    def pending(self) -> Tuple[List[str], Optional[np.ndarray], List[dict], set]:
+        """
+        Vectors not yet in the store (both generations) as (ids, matrix,
+        metadatas), plus the ids whose deletion is pending
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(self.ENTRIES_KEY + self.FLUSHING_SUFFIX)
+        pipe.hgetall(self.ENTRIES_KEY)
+        pipe.smembers(self.DELETES_KEY + self.FLUSHING_SUFFIX)
+        pipe.smembers(self.DELETES_KEY)
+        flushing_entries, entries, flushing_deletes, deletes = pipe.execute()
+        
+        # The newer generation wins for ids present in both
+        entries = {**flushing_entries, **entries}
+        deleted = {i.decode() for i in flushing_deletes | deletes}
+        
+        ids, rows, metadatas = [], [], []
+        for article_id, data in entries.items():
+            vector, header = _unpack(data)
+            ids.append(article_id.decode())
+            rows.append(vector)
+            metadatas.append(header["metadata"])
+        
+        return ids, (np.vstack(rows) if rows else None), metadatas, deleted
+    
+    def flush(self, collection) -> Dict[str, int]:
+        """Write pending adds (as upserts) and deletes to the collection"""
+        if not self.redis.set(self.LOCK_KEY, "1", nx=True, ex=300):
+            return {"upserted": 0, "deleted": 0, "skipped": 1}
+        
+        try:
+            self._drain_legacy()
+            self._rotate()
+            upserted, dead = self._flush_adds(collection)
+            deleted = self._flush_deletes(collection)
+            return {"upserted": upserted, "deleted": deleted, "dead_lettered": dead}
+        finally:
+            self.redis.delete(self.LOCK_KEY)
+    
+    def _rotate(self):
+        """Start a flushing generation of adds and deletes together"""
+        keys = []
+        for key in (self.ENTRIES_KEY, self.DELETES_KEY):
+            keys += [key, key + self.FLUSHING_SUFFIX]
+        self.redis.register_script(ROTATE_SCRIPT)(keys=keys)
+    
+    def _drain_legacy(self):
+        """Repack entries queued in the old two-hash layout (newer entries win)"""
+        for suffix in (self.FLUSHING_SUFFIX, ""):
+            vectors = self.redis.hgetall(self.LEGACY_VECTORS_KEY + suffix)
+            meta = self.redis.hgetall(self.LEGACY_META_KEY + suffix)
+            for article_id, data in vectors.items():
+                entry = json.loads(meta[article_id]) if article_id in meta else None
+                if entry and entry.get("metadata"):
+                    self.redis.hsetnx(self.ENTRIES_KEY, article_id, _pack(np.frombuffer(data, dtype='<f4'), entry["metadata"], entry["document"]))
+            self.redis.delete(self.LEGACY_VECTORS_KEY + suffix, self.LEGACY_META_KEY + suffix)
+    
+    def _flush_adds(self, collection) -> Tuple[int, int]:
+        entries = self.redis.hgetall(self.ENTRIES_KEY + self.FLUSHING_SUFFIX)
+        
+        ids = list(entries)
+        upserted = dead = 0
+        for start in range(0, len(ids), settings.vector_flush_size):
+            batch = []
+            for article_id in ids[start:start + settings.vector_flush_size]:
+                try:
+                    vector, header = _unpack(entries[article_id])
+                    if not header["metadata"]:
+                        raise ValueError("empty metadata")
+                    batch.append((article_id, vector, header))
+                except Exception as e:
+                    self._dead_letter(article_id, entries[article_id], e)
+                    dead += 1
+            
+            try:
+                self._upsert(collection, batch)
+                upserted += len(batch)
+            except Exception:
+                # Find the entries the store rejects. If it rejects them all and
+                # is unreachable (count() raises) keep the generation for a retry;
+                # if it is up, retry up to MAX_FLUSH_ATTEMPTS, then give up on them
+                rejected = []
+                for entry in batch:
+                    try:
+                        self._upsert(collection, [entry])
+                        upserted += 1
+                    except Exception as e:
+                        rejected.append((entry[0], e))
+                if rejected and len(rejected) == len(batch):
+                    collection.count()
+                    if self.redis.incr(self.ATTEMPTS_KEY) < self.MAX_FLUSH_ATTEMPTS:
+                        raise rejected[0][1]
+                for article_id, error in rejected:
+                    self._dead_letter(article_id, entries[article_id], error)
+                    dead += 1
+            
+            # Done entries leave the generation so a retry only redoes the rest
+            self.redis.hdel(self.ENTRIES_KEY + self.FLUSHING_SUFFIX, *ids[start:start + settings.vector_flush_size])
+        
+        self.redis.delete(self.ENTRIES_KEY + self.FLUSHING_SUFFIX, self.ATTEMPTS_KEY)
+        return upserted, dead
+    
+    @staticmethod
+    def _upsert(collection, batch):
+        if not batch:
+            return
+        collection.upsert(
+            ids=[article_id.decode() for article_id, _, _ in batch],
+            embeddings=[vector.tolist() for _, vector, _ in batch],
+            metadatas=[header["metadata"] for _, _, header in batch],
+            documents=[header["document"] for _, _, header in batch]
+        )
+    
+    def _dead_letter(self, article_id: bytes, data: bytes, error: Exception):
+        print(f"Vector buffer: dropping {article_id.decode()} to dead letter: {error}")
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(self.DEAD_LETTER_KEY, article_id, data)
+        pipe.hset(self.DEAD_LETTER_KEY + ":errors", article_id, f"{time.time()}:{error}")
+        pipe.expire(self.DEAD_LETTER_KEY, 7 * 24 * 3600)
+        pipe.expire(self.DEAD_LETTER_KEY + ":errors", 7 * 24 * 3600)
+        pipe.execute()
+    
+    def _flush_deletes(self, collection) -> int:
+        ids = [i.decode() for i in self.redis.smembers(self.DELETES_KEY + self.FLUSHING_SUFFIX)]
+        for start in range(0, len(ids), settings.vector_eviction_batch_size):
+            collection.delete(ids=ids[start:start + settings.vector_eviction_batch_size])
+        
+        self.redis.delete(self.DELETES_KEY + self.FLUSHING_SUFFIX)
+        return len(ids)
+
+
+vector_buffer = VectorWriteBuffer()
@@ -1,62 +1,292 @@
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-from sentence_transformers import SentenceTransformer
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
 import hashlib
+import threading
+import time
+import numpy as np
 
 from app.config import settings
+from app.services.embedding_backends import EmbeddingBackend, get_embedding_backend, cache_namespace
+from app.services.embedding_cache import embedding_cache
+from app.services.vector_buffer import vector_buffer
 
 
 class VectorStore:
+    """
+    Chroma collection + embedding backend, both built on first use so that
+    importing the services package (API, beat, publishers) stays cheap and
+    does not fail when Chroma is down. Construction is guarded by locks and
+    its duration is kept in init_timings. The backend (PyTorch or int8 ONNX)
+    is chosen by settings.embedding_backend; settings.vector_backend = "local"
+    swaps Chroma for an embedded on-disk index (LocalVectorIndex).
+    With vector_buffer_enabled, writes are queued in VectorWriteBuffer and
+    flushed in bulk; dedup checks also search the queued vectors.
+    """
+    
     def __init__(self):
-        self.client = chromadb.HttpClient(
-            host=settings.chroma_host,
-            port=settings.chroma_port,
-            settings=ChromaSettings(anonymized_telemetry=False)
-        )
-        self.collection = self.client.get_or_create_collection(
-            name="articles",
-            metadata={"hnsw:space": "cosine"}
-        )
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model_name = settings.embedding_model
+        self.cache_namespace = cache_namespace()
+        self.init_timings: Dict[str, float] = {}
+        self._client = None
+        self._collection = None
+        self._backend = None
+        self._client_lock = threading.Lock()
+        self._backend_lock = threading.Lock()
+    
+    @property
+    def client(self):
+        if self._client is None:
+            self._connect()
+        return self._client
+    
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._connect()
+        return self._collection
+    
+    @property
+    def backend(self) -> EmbeddingBackend:
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    started = time.perf_counter()
+                    self._backend = get_embedding_backend()
+                    self._record_timing(f"{self._backend.name} embedding backend", started)
+        return self._backend
+    
+    def _connect(self):
+        with self._client_lock:
+            if self._collection is not None:
+                return
+            
+            started = time.perf_counter()
+            if settings.vector_backend == "local":
+                from app.services.local_index import LocalVectorIndex
+                
+                self._collection = self._client = LocalVectorIndex(settings.local_index_dir)
+                self._record_timing("local index", started)
+                return
+            
+            import chromadb
+            from chromadb.config import Settings as ChromaSettings
+            
+            client = chromadb.HttpClient(
+                host=settings.chroma_host,
+                port=settings.chroma_port,
+                settings=ChromaSettings(anonymized_telemetry=False)
+            )
+            self._collection = client.get_or_create_collection(
+                name="articles",
+                metadata={"hnsw:space": "cosine"}
+            )
+            self._client = client
+            self._record_timing("chroma", started)
+    
+    def _record_timing(self, name: str, started: float):
+        self.init_timings[name] = round(time.perf_counter() - started, 3)
+        print(f"Vector store: {name} initialized in {self.init_timings[name]:.3f}s")
     
     def generate_embedding(self, text: str) -> List[float]:
-        return self.model.encode(text).tolist()
+        return self.generate_embeddings([text])[0].tolist()
+    
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Encode many texts in one batched forward pass, skipping cached ones"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        cached = embedding_cache.get_many(self.cache_namespace, texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        
+        if missing:
+            encoded = self.backend.encode([texts[i] for i in missing], settings.embedding_batch_size)
+            embedding_cache.put_many(self.cache_namespace, [texts[i] for i in missing], encoded)
+            for i, vector in zip(missing, encoded):
+                cached[i] = vector
+        
+        return np.vstack(cached).astype(np.float32, copy=False)
+    
+    def _dedup_text(self, title: str, content: str) -> str:
+        return f"{title} {content[:500]}"
+    
+    def embed_for_dedup(self, items: List[Tuple[str, str]]) -> np.ndarray:
+        """Embeddings of (title, content) pairs exactly as used for duplicate checks"""
+        return self.generate_embeddings([self._dedup_text(title, content) for title, content in items])
+    
+    @staticmethod
+    def pack_embedding(embedding) -> bytes:
+        """Compact float32 bytes for storing an embedding in Postgres"""
+        return np.asarray(embedding, dtype='<f4').tobytes()
+    
+    @staticmethod
+    def unpack_embedding(data: Optional[bytes]) -> Optional[List[float]]:
+        if not data:
+            return None
+        return np.frombuffer(data, dtype='<f4').tolist()
     
     def generate_id(self, url: str) -> str:
         return hashlib.md5(url.encode()).hexdigest()
     
-    def check_duplicate(self, title: str, content: str) -> Tuple[bool, Optional[str], Optional[float]]:
+    def check_duplicate(
+        self,
+        title: str,
+        content: str,
+        site_id: Optional[str] = None
+    ) -> Tuple[bool, Optional[str], Optional[float]]:
         """Check if similar content exists. Returns (is_duplicate, existing_id, similarity_score)"""
-        combined_text = f"{title} {content[:500]}"
-        embedding = self.generate_embedding(combined_text)
+        return self.check_duplicates([(title, content)], site_id=site_id)[0]
+    
+    def dedup_filter(self, site_id: Optional[str] = None) -> Optional[dict]:
+        """
+        Chroma metadata filter limiting dedup to the recency window and, when
+        dedup_site_scoped is on, to the given site's articles
+        """
+        conditions = []
+        if settings.dedup_window_days:
+            cutoff = time.time() - settings.dedup_window_days * 24 * 3600
+            conditions.append({"created_at": {"$gte": int(cutoff)}})
+        if settings.dedup_site_scoped and site_id:
+            conditions.append({"site_id": site_id})
+        
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+    
+    def check_duplicates(
+        self,
+        items: List[Tuple[str, str]],
+        embeddings: Optional[np.ndarray] = None,
+        site_id: Optional[str] = None,
+        earlier: Optional[List[Tuple[str, np.ndarray]]] = None
+    ) -> List[Tuple[bool, Optional[str], Optional[float]]]:
+        """
+        Batch version of check_duplicate for a whole poll's (title, content) pairs.
+        Encodes all items in one pass (unless embeddings from embed_for_dedup are
+        given), queries Chroma once, and also flags items that near-duplicate an
+        earlier item of the same batch (existing_id is None). Vectors still in
+        the write buffer are searched too, as are the (article_id, embedding)
+        pairs in earlier: originals accepted by previous batches of the same
+        poll, which are not in the store or the buffer until processed.
+        """
+        if not items:
+            return []
+        
+        if embeddings is None:
+            embeddings = self.embed_for_dedup(items)
+        
+        pending_ids, pending_vectors, pending_deleted = self._pending_for_dedup(site_id)
+        if earlier:
+            earlier_vectors = np.vstack([embedding for _, embedding in earlier]).astype(np.float32, copy=False)
+            earlier_vectors = earlier_vectors / np.clip(np.linalg.norm(earlier_vectors, axis=1, keepdims=True), 1e-12, None)
+            pending_ids = pending_ids + [article_id for article_id, _ in earlier]
+            pending_vectors = earlier_vectors if pending_vectors is None else np.vstack([pending_vectors, earlier_vectors])
         
         results = self.collection.query(
-            query_embeddings=[embedding],
-            n_results=1
+            query_embeddings=embeddings.tolist(),
+            # Extra candidates in case the best ones are queued for deletion
+            n_results=1 + min(len(pending_deleted), 3),
+            where=self.dedup_filter(site_id)
         )
         
-        if not results['ids'][0]:
-            return False, None, None
+        # Cosine similarity between batch members
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        normalized = embeddings / np.clip(norms, 1e-12, None)
+        batch_similarity = normalized @ normalized.T
+        pending_similarity = normalized @ pending_vectors.T if pending_vectors is not None else None
         
-        # ChromaDB returns distances, convert to similarity
-        distance = results['distances'][0][0] if results['distances'][0] else 1.0
-        similarity = 1 - distance  # Cosine similarity
+        decisions = []
+        kept = []  # Indexes of batch items that are not duplicates
+        for i in range(len(items)):
+            similarity = None
+            match_id = None
+            
+            # Against stored articles - ChromaDB returns distances, convert to similarity
+            for candidate_id, distance in zip(results['ids'][i], results['distances'][i]):
+                if candidate_id not in pending_deleted:
+                    match_id, similarity = candidate_id, 1 - distance  # Cosine similarity
+                    break
+            
+            # Against articles waiting in the write buffer
+            if pending_similarity is not None:
+                best = int(np.argmax(pending_similarity[i]))
+                if similarity is None or pending_similarity[i, best] > similarity:
+                    match_id, similarity = pending_ids[best], float(pending_similarity[i, best])
+            
+            if similarity is not None and similarity >= settings.similarity_threshold:
+                decisions.append((True, match_id, similarity))
+                continue
+            
+            # Against earlier items of this batch
+            if kept:
+                best = max(kept, key=lambda j: batch_similarity[i, j])
+                batch_best = float(batch_similarity[i, best])
+                if batch_best >= settings.similarity_threshold:
+                    decisions.append((True, None, batch_best))
+                    continue
+                similarity = max(similarity or 0.0, batch_best)
+            
+            kept.append(i)
+            decisions.append((False, None, similarity))
         
-        if similarity >= settings.similarity_threshold:
-            return True, results['ids'][0][0], similarity
+        return decisions
+    
+    def _pending_for_dedup(self, site_id: Optional[str]):
+        """Buffered vectors visible to a dedup query (same scope as dedup_filter)"""
+        if not settings.vector_buffer_enabled:
+            return [], None, set()
         
-        return False, None, similarity
+        try:
+            ids, vectors, metadatas, deleted = vector_buffer.pending()
+        except Exception as e:
+            print(f"Vector buffer read error: {e}")
+            return [], None, set()
+        
+        if vectors is None:
+            return [], None, deleted
+        
+        cutoff = time.time() - settings.dedup_window_days * 24 * 3600 if settings.dedup_window_days else None
+        rows = [
+            j for j, metadata in enumerate(metadatas)
+            if (cutoff is None or metadata.get("created_at", time.time()) >= cutoff)
+            and not (settings.dedup_site_scoped and site_id and metadata.get("site_id") != site_id)
+        ]
+        if not rows:
+            return [], None, deleted
+        
+        vectors = vectors[rows]
+        vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return [ids[j] for j in rows], vectors, deleted
     
-    def add_article(self, article_id: str, title: str, content: str, metadata: dict = None) -> str:
-        """Add article to vector store"""
-        combined_text = f"{title} {content[:500]}"
-        embedding = self.generate_embedding(combined_text)
+    def add_article(
+        self,
+        article_id: str,
+        title: str,
+        content: str,
+        metadata: dict = None,
+        embedding: Optional[List[float]] = None
+    ) -> str:
+        """
+        Add article to vector store, reusing the ingestion-time embedding when given.
+        metadata should carry site_id and created_at (epoch seconds) for windowed dedup.
+        Written as an upsert, so retries are idempotent
+        """
+        combined_text = self._dedup_text(title, content)
+        if embedding is None:
+            embedding = self.generate_embedding(combined_text)
+        
+        metadata = dict(metadata or {})
+        metadata.setdefault("created_at", int(time.time()))
         
-        self.collection.add(
+        if settings.vector_buffer_enabled:
+            try:
+                vector_buffer.add(article_id, embedding, metadata, combined_text)
+                return article_id
+            except Exception as e:
+                print(f"Vector buffer write error, writing directly: {e}")
+        
+        self.collection.upsert(
             ids=[article_id],
-            embeddings=[embedding],
-            metadatas=[metadata or {}],
+            embeddings=[np.asarray(embedding, dtype=float).tolist()],
+            metadatas=[metadata],
             documents=[combined_text]
         )
         
@@ -64,11 +294,60 @@ class VectorStore:
     
     def delete_article(self, article_id: str) -> bool:
         """Remove article from vector store"""
+        return self.delete_articles([article_id]) == 1
+    
+    def delete_articles(self, article_ids: List[str]) -> int:
+        """Remove many articles from the vector store (queued when buffering)"""
+        if settings.vector_buffer_enabled and article_ids:
+            try:
+                vector_buffer.delete(article_ids)
+                return len(article_ids)
+            except Exception as e:
+                print(f"Vector buffer write error, deleting directly: {e}")
+        
+        deleted = 0
+        for start in range(0, len(article_ids), settings.vector_eviction_batch_size):
+            batch = article_ids[start:start + settings.vector_eviction_batch_size]
+            try:
+                self.collection.delete(ids=batch)
+                deleted += len(batch)
+            except Exception as e:
+                print(f"Vector delete error: {e}")
+        return deleted
+    
+    def needs_flush(self) -> bool:
+        """Whether the write buffer reached vector_flush_size"""
+        if not settings.vector_buffer_enabled:
+            return False
         try:
-            self.collection.delete(ids=[article_id])
-            return True
+            return vector_buffer.size() >= settings.vector_flush_size
         except Exception:
             return False
+    
+    def flush_writes(self) -> dict:
+        """Apply buffered upserts and deletes to the collection"""
+        return vector_buffer.flush(self.collection)
+    
+    def evict_expired(self, cutoff: float) -> None:
+        """Delete vectors created before cutoff (epoch seconds)"""
+        self.collection.delete(where={"created_at": {"$lt": int(cutoff)}})
+    
+    def iter_metadata(self):
+        """Yield (ids, metadatas) pages over the whole collection"""
+        offset = 0
+        while True:
+            page = self.collection.get(
+                include=["metadatas"],
+                limit=settings.vector_eviction_batch_size,
+                offset=offset
+            )
+            if not page["ids"]:
+                return
+            yield page["ids"], page["metadatas"]
+            offset += len(page["ids"])
+    
+    def update_metadata(self, article_ids: List[str], metadatas: List[dict]) -> None:
+        self.collection.update(ids=article_ids, metadatas=metadatas)
 
 
 vector_store = VectorStore()
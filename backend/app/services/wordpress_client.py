@@ -1,9 +1,9 @@
-import httpx
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from base64 import b64encode
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.services.encryption import encryption_service
+from app.services.http_client import http_clients
 
 
 class WordPressClient:
@@ -30,29 +30,29 @@ class WordPressClient:
         page = 1
         per_page = 100
         
-        async with httpx.AsyncClient() as client:
-            while True:
-                response = await client.get(
-                    f"{self.api_base}/categories",
-                    headers=self._get_headers(),
-                    params={"per_page": per_page, "page": page},
-                    timeout=30
-                )
-                
-                if response.status_code != 200:
-                    break
-                
-                data = response.json()
-                if not data:
-                    break
-                
-                categories.extend(data)
-                
-                # Check if more pages
-                total_pages = int(response.headers.get('X-WP-TotalPages', 1))
-                if page >= total_pages:
-                    break
-                page += 1
+        client = http_clients.get("wordpress")
+        while True:
+            response = await client.get(
+                f"{self.api_base}/categories",
+                headers=self._get_headers(),
+                params={"per_page": per_page, "page": page},
+                timeout=30
+            )
+            
+            if response.status_code != 200:
+                break
+            
+            data = response.json()
+            if not data:
+                break
+            
+            categories.extend(data)
+            
+            # Check if more pages
+            total_pages = int(response.headers.get('X-WP-TotalPages', 1))
+            if page >= total_pages:
+                break
+            page += 1
         
         return categories
     
@@ -64,36 +64,35 @@ class WordPressClient:
         alt_text: str = ""
     ) -> Optional[Dict[str, Any]]:
         """Upload image to WordPress media library"""
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Authorization": f"Basic {self.auth_header}",
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Content-Type": "image/jpeg"
-            }
-            
-            response = await client.post(
-                f"{self.api_base}/media",
-                headers=headers,
-                content=image_data,
-                timeout=60
-            )
+        client = http_clients.get("wordpress")
+        headers = {
+            "Authorization": f"Basic {self.auth_header}",
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Type": "image/jpeg"
+        }
+        
+        response = await client.post(
+            f"{self.api_base}/media",
+            headers=headers,
+            content=image_data
+        )
+        
+        if response.status_code in [200, 201]:
+            media = response.json()
             
-            if response.status_code in [200, 201]:
-                media = response.json()
-                
-                # Update alt text
-                if alt_text:
-                    await client.post(
-                        f"{self.api_base}/media/{media['id']}",
-                        headers=self._get_headers(),
-                        json={"alt_text": alt_text},
-                        timeout=30
-                    )
-                
-                return media
+            # Update alt text
+            if alt_text:
+                await client.post(
+                    f"{self.api_base}/media/{media['id']}",
+                    headers=self._get_headers(),
+                    json={"alt_text": alt_text},
+                    timeout=30
+                )
             
-            print(f"Image upload failed: {response.status_code} - {response.text}")
-            return None
+            return media
+        
+        print(f"Image upload failed: {response.status_code} - {response.text}")
+        return None
     
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=5))
     async def create_post(
@@ -130,38 +129,34 @@ class WordPressClient:
                 "rank_math_description": meta_description
             }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.api_base}/posts",
-                headers=self._get_headers(),
-                json=post_data,
-                timeout=60
-            )
-            
-            if response.status_code in [200, 201]:
-                return response.json()
-            
-            print(f"Post creation failed: {response.status_code} - {response.text}")
-            return None
+        client = http_clients.get("wordpress")
+        response = await client.post(
+            f"{self.api_base}/posts",
+            headers=self._get_headers(),
+            json=post_data
+        )
+        
+        if response.status_code in [200, 201]:
+            return response.json()
+        
+        print(f"Post creation failed: {response.status_code} - {response.text}")
+        return None
     
     async def test_connection(self) -> Tuple[bool, str]:
         """Test WordPress connection"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.api_base}/users/me",
-                    headers=self._get_headers(),
-                    timeout=15
-                )
-                
-                if response.status_code == 200:
-                    user = response.json()
-                    return True, f"Connected as {user.get('name', 'Unknown')}"
-                else:
-                    return False, f"Auth failed: {response.status_code}"
+            client = http_clients.get("wordpress")
+            response = await client.get(
+                f"{self.api_base}/users/me",
+                headers=self._get_headers(),
+                timeout=15
+            )
+            
+            if response.status_code == 200:
+                user = response.json()
+                return True, f"Connected as {user.get('name', 'Unknown')}"
+            else:
+                return False, f"Auth failed: {response.status_code}"
                     
         except Exception as e:
             return False, str(e)
-
-
-from typing import Tuple
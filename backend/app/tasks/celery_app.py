@@ -37,18 +37,20 @@ celery_app.conf.task_default_queue = 'default'
 
 # Beat schedule - periodic tasks
 celery_app.conf.beat_schedule = {
-    'poll-news-sources': {
-        'task': 'app.tasks.ingestion_tasks.poll_all_sources',
-        'schedule': crontab(minute='*/10'),  # Every 10 minutes
-        'kwargs': {'velocity_mode': 'news'}
-    },
-    'poll-evergreen-sources': {
-        'task': 'app.tasks.ingestion_tasks.poll_all_sources',
-        'schedule': crontab(hour='*/24'),  # Every 24 hours
-        'kwargs': {'velocity_mode': 'evergreen'}
+    'poll-due-sources': {
+        'task': 'app.tasks.ingestion_tasks.poll_due_sources',
+        'schedule': crontab(minute='*'),  # Every minute - only due sources are enqueued
     },
     'cleanup-old-articles': {
         'task': 'app.tasks.processing_tasks.cleanup_old_articles',
         'schedule': crontab(hour=3, minute=0),  # Daily at 3 AM
     },
+    'flush-vector-buffer': {
+        'task': 'app.tasks.processing_tasks.flush_vector_buffer',
+        'schedule': settings.vector_flush_interval,  # Seconds - size-triggered flushes happen in between
+    },
+    'evict-vectors': {
+        'task': 'app.tasks.processing_tasks.evict_vectors',
+        'schedule': crontab(hour=3, minute=30),  # Daily, after cleanup
+    },
 }
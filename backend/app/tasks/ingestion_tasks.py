@@ -1,23 +1,18 @@
-import asyncio
 from datetime import datetime
 from uuid import UUID
-from sqlalchemy import select
+from typing import List, Set, Tuple
+import numpy as np
+from sqlalchemy import select, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 
+from app.config import settings
 from app.tasks.celery_app import celery_app
-from app.models import Source, Site, Article, ArticleStatus, SourceType, VelocityMode
+from app.tasks.runtime import run_async
+from app.models import Source, Site, Article, ArticleStatus, SourceType, ScrapeMode, VelocityMode
 from app.models.base import async_session
-from app.services import content_ingestor, vector_store
-
-
-def run_async(coro):
-    """Helper to run async code in sync context"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
+from app.services import content_ingestor, vector_store, dedup_prefilter, seen_url_index, poll_scheduler, ScrapedArticle, Fingerprint
+from app.utils.urls import url_hash
 
 
 @celery_app.task(bind=True, max_retries=3)
@@ -47,80 +42,103 @@ async def _poll_source(source_id: str):
             
             articles_created = 0
             articles_skipped = 0
+            processed_urls = []
+            accepted = []  # (article_id, embedding, fingerprint) of the originals stored
+            
+            await seen_url_index.ensure_seeded()
             
             # Fetch articles based on source type
             if source.type == SourceType.RSS:
-                scraped_articles = await content_ingestor.parse_rss(
+                feed_result = await content_ingestor.parse_rss(
                     source.url,
-                    max_items=source.max_articles_per_poll
+                    max_items=source.max_articles_per_poll,
+                    etag=source.etag,
+                    last_modified=source.last_modified,
+                    content_hash=source.content_hash
+                )
+                
+                source.etag = feed_result.etag
+                source.last_modified = feed_result.last_modified
+                source.content_hash = feed_result.content_hash
+                
+                # Feed unchanged since last poll - nothing to ingest
+                if feed_result.not_modified:
+                    source.last_polled_at = datetime.utcnow()
+                    poll_scheduler.record_poll(source, site, 0)
+                    await db.commit()
+                    return {
+                        "status": "not_modified",
+                        "source": source.name,
+                        "created": 0,
+                        "skipped": 0
+                    }
+                
+                # Skip entries whose URL was ingested on an earlier poll
+                unseen_urls = await seen_url_index.filter_unseen(
+                    [scraped.url for scraped in feed_result.articles]
                 )
+                existing_hashes = await _existing_url_hashes(db, unseen_urls)
+                unseen_urls = {url for url in unseen_urls if url_hash(url) not in existing_hashes}
+                
+                batch = [scraped for scraped in feed_result.articles if scraped.url in unseen_urls]
+                processed_urls.extend(scraped.url for scraped in batch)
+                
+                accepted = await _store_scraped_batch(db, source, site, batch)
+                articles_created += len(accepted)
+                articles_skipped += len(feed_result.articles) - len(accepted)
             else:
-                # URL scraping - get links first then scrape each
+                # URL scraping - get links first, then scrape them concurrently
+                # and store each article as soon as its fetch completes
                 links = await content_ingestor.scrape_links_from_page(
                     source.url,
-                    source.scrape_config.get('link_selector', 'a')
+                    source.scrape_config.get('link_selector', 'a'),
+                    source.scrape_config
                 )
                 
-                scraped_articles = []
-                for link in links[:source.max_articles_per_poll]:
-                    article = await content_ingestor.scrape_url(
-                        link,
-                        source.scrape_config
-                    )
-                    if article:
-                        scraped_articles.append(article)
-            
-            # Process each scraped article
-            for scraped in scraped_articles:
-                # Check if URL already exists
-                existing = await db.execute(
-                    select(Article).where(Article.original_url == scraped.url)
-                )
-                if existing.scalar_one_or_none():
-                    articles_skipped += 1
-                    continue
+                # Never re-scrape links that were already ingested
+                links = await seen_url_index.filter_unseen(links)
+                existing_hashes = await _existing_url_hashes(db, links)
+                links = [link for link in links if url_hash(link) not in existing_hashes]
                 
-                # Check semantic duplicate
-                is_duplicate, existing_id, similarity = vector_store.check_duplicate(
-                    scraped.title,
-                    scraped.content
-                )
+                # Streamed results are deduped in small batches as they arrive;
+                # each batch is also checked against the originals of earlier ones
+                fetch_modes = []
+                batch = []
+                async for scraped in content_ingestor.scrape_urls(
+                    links[:source.max_articles_per_poll],
+                    source.scrape_config,
+                    mode=source.scrape_mode.value if source.scrape_mode else None
+                ):
+                    fetch_modes.append(scraped.fetch_mode)
+                    processed_urls.append(scraped.url)
+                    batch.append(scraped)
+                    
+                    if len(batch) >= settings.dedup_batch_size:
+                        created = await _store_scraped_batch(db, source, site, batch, accepted)
+                        accepted += created
+                        articles_created += len(created)
+                        articles_skipped += len(batch) - len(created)
+                        batch = []
                 
-                if is_duplicate:
-                    # Create article record as duplicate
-                    article = Article(
-                        source_id=source.id,
-                        site_id=site.id,
-                        original_url=scraped.url,
-                        original_title=scraped.title,
-                        original_content=scraped.content,
-                        original_image_url=scraped.image_url,
-                        target_language=site.target_language,
-                        status=ArticleStatus.DUPLICATE,
-                        similarity_score=str(round(similarity, 3)) if similarity else None
-                    )
-                    db.add(article)
-                    articles_skipped += 1
-                    continue
+                created = await _store_scraped_batch(db, source, site, batch, accepted)
+                accepted += created
+                articles_created += len(created)
+                articles_skipped += len(batch) - len(created)
                 
-                # Create new article
-                article = Article(
-                    source_id=source.id,
-                    site_id=site.id,
-                    original_url=scraped.url,
-                    original_title=scraped.title,
-                    original_content=scraped.content,
-                    original_image_url=scraped.image_url,
-                    target_language=site.target_language,
-                    status=ArticleStatus.PENDING
-                )
-                db.add(article)
-                articles_created += 1
+                # Remember whether this source works without a browser
+                if 'static' in fetch_modes or 'browser' in fetch_modes:
+                    static_wins = fetch_modes.count('static')
+                    source.scrape_mode = ScrapeMode.STATIC if static_wins >= fetch_modes.count('browser') else ScrapeMode.BROWSER
             
-            # Update last polled
+            # Update last polled and schedule the next poll from this poll's yield
             source.last_polled_at = datetime.utcnow()
+            poll_scheduler.record_poll(source, site, articles_created)
             await db.commit()
             
+            await seen_url_index.add(processed_urls)
+            # Only index fingerprints of articles that were actually committed
+            dedup_prefilter.add([(article_id, fp) for article_id, _, fp in accepted], site_id=str(site.id))
+            
             # Trigger processing for new articles
             from app.tasks.processing_tasks import process_pending_articles
             if articles_created > 0:
@@ -138,6 +156,139 @@ async def _poll_source(source_id: str):
             return {"status": "error", "error": str(e)}
 
 
+async def _existing_url_hashes(db, urls: List[str]) -> Set[str]:
+    """Return the url_hash values among urls that already have an article (one query per batch)"""
+    hashes = list({url_hash(url) for url in urls})
+    if not hashes:
+        return set()
+    
+    result = await db.execute(
+        select(Article.url_hash).where(Article.url_hash.in_(hashes))
+    )
+    return set(result.scalars().all())
+
+
+async def _store_scraped_batch(
+    db,
+    source: Source,
+    site: Site,
+    batch: List[ScrapedArticle],
+    earlier: List[Tuple[str, np.ndarray, Fingerprint]] = None
+) -> List[Tuple[str, np.ndarray, Fingerprint]]:
+    """
+    Dedup a batch of scraped articles and insert them. earlier holds the
+    (article_id, embedding, fingerprint) triples returned for previous batches
+    of the same poll. Returns those triples for the articles created as
+    PENDING; the caller indexes their fingerprints once the poll commits
+    """
+    earlier = earlier or []
+    if not batch:
+        return []
+    
+    items = [(scraped.title, scraped.content) for scraped in batch]
+    decisions = [None] * len(batch)
+    embeddings = [None] * len(batch)
+    
+    # Exact and near copies are resolved by fingerprint, without the embedding model
+    fingerprints, matches = dedup_prefilter.check(
+        items,
+        site_id=str(site.id),
+        earlier=[(article_id, fp) for article_id, _, fp in earlier]
+    )
+    for i, match in enumerate(matches):
+        if match is not None:
+            decisions[i] = (True, match[0], match[1])
+    
+    # Check semantic duplicates for the rest of the batch in one encode + query
+    undecided = [i for i, match in enumerate(matches) if match is None]
+    if undecided:
+        undecided_items = [items[i] for i in undecided]
+        undecided_embeddings = vector_store.embed_for_dedup(undecided_items)
+        undecided_decisions = vector_store.check_duplicates(
+            undecided_items,
+            embeddings=undecided_embeddings,
+            site_id=str(site.id),
+            earlier=[(article_id, embedding) for article_id, embedding, _ in earlier]
+        )
+        for i, embedding, decision in zip(undecided, undecided_embeddings, undecided_decisions):
+            embeddings[i] = embedding
+            decisions[i] = decision
+    
+    created = []
+    for scraped, fingerprint, embedding, (is_duplicate, existing_id, similarity) in zip(batch, fingerprints, embeddings, decisions):
+        values = {
+            "source_id": source.id,
+            "site_id": site.id,
+            "original_url": scraped.url,
+            "url_hash": url_hash(scraped.url),
+            "original_title": scraped.title,
+            "original_content": scraped.content,
+            "original_image_url": scraped.image_url,
+            "target_language": site.target_language,
+            "status": ArticleStatus.PENDING
+        }
+        
+        if is_duplicate:
+            # Create article record as duplicate
+            values["status"] = ArticleStatus.DUPLICATE
+            values["similarity_score"] = str(round(similarity, 3)) if similarity else None
+        else:
+            # Kept so processing can add this exact vector instead of re-encoding
+            values["dedup_embedding"] = vector_store.pack_embedding(embedding)
+        
+        # Concurrent pollers may race on the same URL - the unique url_hash index decides
+        result = await db.execute(
+            pg_insert(Article)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[Article.url_hash])
+            .returning(Article.id)
+        )
+        article_id = result.scalar_one_or_none()
+        
+        if article_id is not None and not is_duplicate:
+            created.append((str(article_id), embedding, fingerprint))
+    
+    return created
+
+
+@celery_app.task
+def poll_due_sources():
+    """Enqueue polls for sources whose adaptive next_poll_at has passed"""
+    return run_async(_poll_due_sources())
+
+
+async def _poll_due_sources():
+    """Async implementation"""
+    async with async_session() as db:
+        now = datetime.utcnow()
+        
+        result = await db.execute(
+            select(Source)
+            .options(selectinload(Source.site))
+            .join(Site)
+            .where(
+                Source.is_active == True,
+                Site.is_active == True,
+                or_(Source.next_poll_at == None, Source.next_poll_at <= now)
+            )
+            .order_by(Source.next_poll_at.asc().nullsfirst())
+            .with_for_update(of=Source, skip_locked=True)
+        )
+        sources = result.scalars().all()
+        
+        # Lease: push next_poll_at out by the current interval so a slow poll is not
+        # enqueued again on the next tick; _poll_source sets the real value when done
+        for source in sources:
+            interval = poll_scheduler.current_interval(source, source.site)
+            source.next_poll_at = poll_scheduler.next_poll_at(interval, now)
+        await db.commit()
+        
+        for source in sources:
+            poll_source.delay(str(source.id))
+        
+        return {"sources_queued": len(sources)}
+
+
 @celery_app.task
 def poll_all_sources(velocity_mode: str = "news"):
     """Poll all sources matching velocity mode"""
@@ -1,27 +1,19 @@
-import asyncio
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from sqlalchemy import select, delete
 from sqlalchemy.orm import selectinload
 
+from app.config import settings
 from app.tasks.celery_app import celery_app
-from app.models import Article, ArticleStatus, Site, ImageSource
+from app.tasks.runtime import run_async
+from app.models import Article, ArticleStatus, Site, ImageSource, RewriteMode
 from app.models.base import async_session
 from app.services import ai_processor, image_pipeline, vector_store, WordPressClient
 from app.services.encryption import encryption_service
 from app.utils.watermark import watermarker
 
 
-def run_async(coro):
-    """Helper to run async code in sync context"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 @celery_app.task(bind=True, max_retries=3)
 def process_article(self, article_id: str):
     """Process a single article through the AI pipeline"""
@@ -64,7 +56,8 @@ async def _process_article(article_id: str):
                 content=article.original_content,
                 source_language=source_lang,
                 target_language=site.target_language,
-                category_map=site.category_map
+                category_map=site.category_map,
+                mode=(site.rewrite_mode or RewriteMode.TWO_STEP).value
             )
             
             article.processed_title = ai_result.get("title", article.original_title)
@@ -92,13 +85,22 @@ async def _process_article(article_id: str):
             article.image_source = ImageSource(image_source)
             
             # Step 4: Add to vector store
+            # Index the original text with its ingestion-time embedding so later
+            # dedup queries (which embed original scraped text) compare like with like
             vector_id = vector_store.add_article(
                 article_id=str(article.id),
-                title=article.processed_title,
-                content=article.processed_content,
-                metadata={"site_id": str(site.id), "source_language": source_lang}
+                title=article.original_title,
+                content=article.original_content,
+                metadata={
+                    "site_id": str(site.id),
+                    "source_language": source_lang,
+                    "created_at": _epoch(article.created_at)
+                },
+                embedding=vector_store.unpack_embedding(article.dedup_embedding)
             )
             article.vector_id = vector_id
+            if vector_store.needs_flush():
+                flush_vector_buffer.delay()
             
             # Step 5: Publish to WordPress
             wp_client = WordPressClient(
@@ -213,23 +215,86 @@ async def _cleanup_old_articles(days: int):
         cutoff = datetime.utcnow() - timedelta(days=days)
         
         # Delete old duplicates
-        await db.execute(
+        duplicates = await db.execute(
             delete(Article).where(
                 Article.status == ArticleStatus.DUPLICATE,
                 Article.created_at < cutoff
-            )
+            ).returning(Article.vector_id)
         )
+        vector_ids = [vector_id for vector_id in duplicates.scalars() if vector_id]
         
         # Delete old failed articles (after 7 days)
         failed_cutoff = datetime.utcnow() - timedelta(days=7)
-        await db.execute(
+        failed = await db.execute(
             delete(Article).where(
                 Article.status == ArticleStatus.FAILED,
                 Article.created_at < failed_cutoff,
                 Article.retry_count >= 3
-            )
+            ).returning(Article.vector_id)
         )
+        vector_ids += [vector_id for vector_id in failed.scalars() if vector_id]
         
         await db.commit()
         
-        return {"status": "cleanup completed"}
+        # Their vectors must not keep matching new articles
+        vectors_deleted = vector_store.delete_articles(vector_ids) if vector_ids else 0
+        
+        return {"status": "cleanup completed", "vectors_deleted": vectors_deleted}
+
+
+@celery_app.task
+def flush_vector_buffer():
+    """Write buffered vector upserts and deletes to the vector store"""
+    return vector_store.flush_writes()
+
+
+def _epoch(value: datetime) -> int:
+    """Epoch seconds of a naive UTC datetime, as stored in vector metadata"""
+    return int((value or datetime.utcnow()).replace(tzinfo=timezone.utc).timestamp())
+
+
+@celery_app.task
+def evict_vectors():
+    """Drop expired and orphaned vectors so the collection stays bounded"""
+    return run_async(_evict_vectors())
+
+
+async def _evict_vectors():
+    """Async implementation"""
+    # Expired: older than the retention window (always >= the dedup window)
+    retention_days = max(settings.vector_retention_days, settings.dedup_window_days)
+    vector_store.evict_expired(time.time() - retention_days * 24 * 3600)
+    
+    # Orphaned: no article row any more (deleted sites/articles). Vectors written
+    # before created_at was recorded get it backfilled from Postgres.
+    orphans = set()
+    backfilled = 0
+    async with async_session() as db:
+        for ids, metadatas in vector_store.iter_metadata():
+            article_ids = []
+            for vector_id in ids:
+                try:
+                    article_ids.append(UUID(vector_id))
+                except ValueError:
+                    orphans.add(vector_id)
+            
+            result = await db.execute(
+                select(Article.id, Article.created_at).where(Article.id.in_(article_ids))
+            )
+            existing = {str(article_id): created_at for article_id, created_at in result.all()}
+            
+            updates = []
+            for vector_id, metadata in zip(ids, metadatas):
+                if vector_id not in existing:
+                    orphans.add(vector_id)
+                elif (metadata or {}).get("created_at") is None:
+                    updates.append((vector_id, {**(metadata or {}), "created_at": _epoch(existing[vector_id])}))
+            
+            if updates:
+                vector_store.update_metadata([u[0] for u in updates], [u[1] for u in updates])
+                backfilled += len(updates)
+    
+    # Deleted after the scan so offset paging does not skip entries
+    deleted = vector_store.delete_articles(list(orphans))
+    
+    return {"status": "eviction completed", "orphans_deleted": deleted, "backfilled": backfilled}
@@ -0,0 +1,57 @@
+import asyncio
+import os
+from celery.signals import worker_process_shutdown, worker_shutdown
+
+
+# One event loop per worker process, reused across tasks so that pooled
+# resources (HTTP keep-alive connections, browser pool, DB pool) outlive a single task.
+_loop = None
+_loop_pid = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Return the persistent event loop for this worker process"""
+    global _loop, _loop_pid
+    
+    # Recreate after fork so children never share the parent's loop
+    if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+        _loop = asyncio.new_event_loop()
+        _loop_pid = os.getpid()
+        asyncio.set_event_loop(_loop)
+    
+    return _loop
+
+
+def run_async(coro):
+    """Helper to run async code in sync context"""
+    return get_worker_loop().run_until_complete(coro)
+
+
+async def _close_resources():
+    from app.services.http_client import http_clients
+    from app.services.browser_pool import browser_pool
+    from app.services.redis_client import redis_clients
+    from app.models.base import engine
+    
+    await browser_pool.close()
+    await http_clients.aclose()
+    await redis_clients.aclose()
+    await engine.dispose()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown_worker_loop(**kwargs):
+    """Close pooled clients and the worker loop when the worker process exits"""
+    global _loop
+    
+    if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+        return
+    
+    try:
+        _loop.run_until_complete(_close_resources())
+    except Exception as e:
+        print(f"Worker shutdown error: {e}")
+    finally:
+        _loop.close()
+        _loop = None
@@ -0,0 +1,57 @@
+import hashlib
+import re
+import unicodedata
+from typing import List
+
+import numpy as np
+
+
+SHINGLE_SIZE = 4  # Words per shingle
+SIMHASH_BITS = 64
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def content_tokens(text: str) -> List[str]:
+    """Lowercased word tokens with punctuation and whitespace differences removed"""
+    return _WORD_RE.findall(unicodedata.normalize("NFKC", text).lower())
+
+
+def content_sha(text: str) -> str:
+    """SHA-256 of the normalized text, equal for byte-different copies of the same wire story"""
+    return hashlib.sha256(" ".join(content_tokens(text)).encode()).hexdigest()
+
+
+def simhash(tokens: List[str], shingle_size: int = SHINGLE_SIZE) -> int:
+    """64-bit SimHash over word shingles; near-identical texts differ in few bits"""
+    if len(tokens) < shingle_size:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    
+    values = np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big") for shingle in set(shingles)],
+        dtype=np.uint64
+    )
+    bits = (values[:, None] >> np.arange(SIMHASH_BITS, dtype=np.uint64)) & np.uint64(1)
+    majority = bits.sum(axis=0) * 2 > len(values)
+    
+    return sum(1 << bit for bit in np.flatnonzero(majority).tolist())
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def simhash_bands(fingerprint: int, bands: int) -> List[int]:
+    """
+    Split a fingerprint into bands for LSH lookup. Two fingerprints within
+    bands - 1 bits of each other share at least one band exactly.
+    """
+    width = SIMHASH_BITS // bands
+    result = []
+    for band in range(bands):
+        start = band * width
+        end = SIMHASH_BITS if band == bands - 1 else start + width
+        result.append(fingerprint >> start & ((1 << (end - start)) - 1))
+    return result
@@ -1,7 +1,8 @@
 from PIL import Image, ImageDraw, ImageFont
 from io import BytesIO
 from typing import Optional, Tuple
-import httpx
+
+from app.services.http_client import http_clients
 
 
 class Watermarker:
@@ -94,9 +95,9 @@ class Watermarker:
     ) -> Optional[bytes]:
         """Download image and apply watermark"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(image_url, timeout=30)
-                image_data = response.content
+            client = http_clients.get("media")
+            response = await client.get(image_url)
+            image_data = response.content
             
             return await self.apply_watermark(image_data, watermark_text, position)
         except Exception as e:
@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.models.base import async_session, engine
+from app.models import Article
+from app.services.ai_processor import ai_processor
+from app.services.http_client import http_clients
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODES = ["single_pass", "two_step"]
+
+async def export_corpus(path: str, limit: int):
+    """Write a fixed corpus of recent cross-language articles to a JSON file"""
+    corpus = []
+    try:
+        async with async_session() as db:
+            result = await db.execute(
+                select(Article)
+                .options(selectinload(Article.site))
+                .order_by(Article.created_at.desc())
+                .limit(limit * 5)
+            )
+            for article in result.scalars():
+                source_language = ai_processor.detect_language(article.original_content or "")
+                if source_language == article.site.target_language:
+                    continue
+                corpus.append({
+                    "title": article.original_title,
+                    "content": article.original_content,
+                    "source_language": source_language,
+                    "target_language": article.site.target_language,
+                    "category_map": article.site.category_map or {}
+                })
+                if len(corpus) >= limit:
+                    break
+    finally:
+        await engine.dispose()
+    
+    with open(path, "w") as f:
+        json.dump(corpus, f, ensure_ascii=False, indent=2)
+    logger.info(f"Exported {len(corpus)} articles to {path}")
+
+async def run_benchmark(path: str):
+    with open(path) as f:
+        corpus = json.load(f)
+    
+    # Measure real API calls, not cache hits
+    settings.llm_cache_enabled = False
+    results = {mode: {"latency": [], "prompt_tokens": 0, "completion_tokens": 0, "calls": 0} for mode in MODES}
+    
+    try:
+        for n, item in enumerate(corpus, 1):
+            for mode in MODES:
+                with ai_processor.track_usage() as usage:
+                    started = time.perf_counter()
+                    await ai_processor.rewrite_article(mode=mode, **item)
+                    results[mode]["latency"].append(time.perf_counter() - started)
+                
+                for key in ("prompt_tokens", "completion_tokens", "calls"):
+                    results[mode][key] += usage[key]
+            logger.info(f"{n}/{len(corpus)} done")
+    finally:
+        await http_clients.aclose()
+    
+    summary = {}
+    for mode, data in results.items():
+        latency = sorted(data["latency"])
+        count = len(latency) or 1
+        summary[mode] = {
+            "articles": len(latency),
+            "latency_mean_s": round(statistics.mean(latency), 2) if latency else 0.0,
+            "latency_p50_s": round(latency[len(latency) // 2], 2) if latency else 0.0,
+            "latency_p95_s": round(latency[min(int(len(latency) * 0.95), len(latency) - 1)], 2) if latency else 0.0,
+            "calls_per_article": round(data["calls"] / count, 2),
+            "prompt_tokens_per_article": round(data["prompt_tokens"] / count),
+            "completion_tokens_per_article": round(data["completion_tokens"] / count)
+        }
+    logger.info(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare single-pass and two-step article rewriting")
+    parser.add_argument("--corpus", default="rewrite_corpus.json", help="Corpus JSON file")
+    parser.add_argument("--export", type=int, metavar="N", help="Export N recent cross-language articles to --corpus and exit")
+    args = parser.parse_args()
+    
+    if args.export:
+        asyncio.run(export_corpus(args.corpus, args.export))
+    else:
+        asyncio.run(run_benchmark(args.corpus))
@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.base import async_session, engine
+from app.models import Article
+from app.services.embedding_backends import OnnxBackend, SentenceTransformerBackend, export_onnx, parity_report
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def load_texts(limit: int):
+    """Recent articles in the exact text format used for dedup"""
+    try:
+        async with async_session() as db:
+            result = await db.execute(
+                select(Article.original_title, Article.original_content)
+                .order_by(Article.created_at.desc())
+                .limit(limit)
+            )
+            return [f"{title} {(content or '')[:500]}" for title, content in result.all()]
+    finally:
+        await engine.dispose()
+
+def parity(limit: int):
+    texts = asyncio.run(load_texts(limit))
+    if len(texts) < 2:
+        logger.error("Need at least two articles in the database for a parity check")
+        return
+    
+    reference = SentenceTransformerBackend(settings.embedding_model)
+    candidate = OnnxBackend(settings.embedding_model, settings.onnx_model_dir)
+    
+    for backend in (reference, candidate):
+        started = time.perf_counter()
+        backend.encode(texts, settings.embedding_batch_size)
+        logger.info(f"{backend.name}: {len(texts) / (time.perf_counter() - started):.1f} texts/s")
+    
+    report = parity_report(reference, candidate, texts)
+    logger.info(json.dumps(report, indent=2))
+    if report["decision_flips"]:
+        logger.warning(f"{report['decision_flips']} duplicate decisions differ at threshold {settings.similarity_threshold}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export and validate the int8 ONNX embedding backend")
+    parser.add_argument("command", choices=["export", "parity"])
+    parser.add_argument("--limit", type=int, default=500, help="Articles to compare in the parity check")
+    args = parser.parse_args()
+    
+    if args.command == "export":
+        path = export_onnx(settings.embedding_model, settings.onnx_model_dir)
+        logger.info(f"Exported {settings.embedding_model} to {path}")
+    else:
+        parity(args.limit)
@@ -0,0 +1,63 @@
+from app.services.feed_stream import FeedStreamParser, parse_entries_with_feedparser
+
+
+def _rss(items: str) -> bytes:
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<rss version="2.0"><channel><title>Feed</title>'
+        f'{items}'
+        '</channel></rss>'
+    ).encode()
+
+
+def _item(n: int, title: str = None) -> str:
+    return (
+        f'<item><title>{title or f"Title {n}"}</title>'
+        f'<link>https://example.com/{n}</link>'
+        f'<description>&lt;p&gt;hello {n}&lt;/p&gt;</description></item>'
+    )
+
+
+def _parse(body: bytes, max_items: int = 10, chunk_size: int = 64) -> FeedStreamParser:
+    parser = FeedStreamParser(max_items)
+    for start in range(0, len(body), chunk_size):
+        if parser.feed(body[start:start + chunk_size]):
+            break
+    else:
+        parser.close()
+    return parser
+
+
+def test_parses_chunked_feed_and_unescapes_html():
+    parser = _parse(_rss("".join(_item(n) for n in range(3))))
+    
+    assert not parser.failed
+    assert [e["link"] for e in parser.entries] == [f"https://example.com/{n}" for n in range(3)]
+    assert parser.entries[1]["content"] == "<p>hello 1</p>"
+
+
+def test_stops_after_max_items():
+    parser = _parse(_rss("".join(_item(n) for n in range(20))), max_items=5)
+    
+    assert parser.done
+    assert len(parser.entries) == 5
+
+
+def test_undefined_entity_fails_instead_of_mangling_escaped_html():
+    body = _rss(_item(0) + _item(1, "A&nbsp;B&mdash;C") + _item(2))
+    parser = _parse(body)
+    
+    # Recover mode used to keep going and strip every later &lt;/&gt;
+    assert parser.failed
+    assert all(e["content"] == f"<p>hello {n}</p>" for n, e in enumerate(parser.entries))
+    
+    entries = parse_entries_with_feedparser(body, 10)
+    assert [e["title"] for e in entries] == ["Title 0", "A\u00a0B\u2014C", "Title 2"]
+    assert [e["content"] for e in entries] == [f"<p>hello {n}</p>" for n in range(3)]
+
+
+def test_entity_in_last_chunk_is_reported_on_close():
+    body = _rss(_item(0) + _item(1, "A&nbsp;B"))
+    parser = _parse(body, chunk_size=len(body))
+    
+    assert parser.failed
@@ -20,6 +20,7 @@ export default function Sites() {
         wp_app_password: '',
         target_language: 'ar',
         velocity_mode: 'news',
+        rewrite_mode: 'two_step',
         category_map: '',
         bing_cookie: '',
         watermark_text: '',
@@ -91,6 +92,7 @@ export default function Sites() {
             wp_app_password: '',
             target_language: site.target_language,
             velocity_mode: site.velocity_mode,
+            rewrite_mode: site.rewrite_mode || 'two_step',
             category_map: categoryText,
             bing_cookie: '',
             watermark_text: site.watermark_text || '',
@@ -138,6 +140,7 @@ export default function Sites() {
             wp_app_password: '',
             target_language: 'ar',
             velocity_mode: 'news',
+            rewrite_mode: 'two_step',
             category_map: '',
             bing_cookie: '',
             watermark_text: '',
@@ -326,6 +329,18 @@ export default function Sites() {
                         </div>
                     </div>
 
+                    <div>
+                        <label className="block text-sm text-gray-400 mb-1">{t('sites.rewriteMode')}</label>
+                        <select
+                            className="input-field"
+                            value={formData.rewrite_mode}
+                            onChange={(e) => setFormData({ ...formData, rewrite_mode: e.target.value })}
+                        >
+                            <option value="two_step">{t('sites.rewriteTwoStep')}</option>
+                            <option value="single_pass">{t('sites.rewriteSinglePass')}</option>
+                        </select>
+                    </div>
+
                     <div>
                         <label className="block text-sm text-gray-400 mb-1">
                             {t('sites.categoryMap')}